@@ -0,0 +1,331 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import pandas as pd
+from gspread.utils import numericise
+
+from bulk import progress_grid
+from cache import as_record
+from fake_sheets import FakeBackend, FakeClient
+from id_allocator import ID_BLOCK_COLUMNS, ID_SHEET, normalize_student_id
+from quota import QuotaScheduler
+from schedule import DAYS, ScheduleIndex, class_days
+from sheets import SheetsPool
+from storage import (PROGRESS_COLUMNS, STUDENT_COLUMNS, SheetsStorage, SQLiteStorage, SyncedStorage,
+                     progress_frame)
+
+# 가짜 시트 위에서 읽기 / 쓰기 / 탭 화면 경로를 돌려 보는 성능 측정
+# 실행: python benchmark.py [--students 10,100,1000,5000] [--weeks 156,104,52,12] [--backend sheets,sqlite]
+# 시나리오마다 API 호출 수, 지연 시간 백분위(p50/p95/max), 메모리(tracemalloc 최대치)를 출력
+# 학생 수마다 진도 표의 기존 표현(object 열)과 형식이 정해진 표현의 메모리 / 거르기 속도도 비교
+
+SPREADSHEET_NAME = "학생진도관리"
+
+# 가상 학생의 반 종류
+CLASS_TYPES = ["월수금", "화목토"]
+
+# 시나리오 기본값 (학생 수, 진도 기록 주 수)
+DEFAULT_STUDENTS = [10, 100, 1000, 5000]
+DEFAULT_WEEKS = [156, 104, 52, 12]
+
+# 가상 진도 기록의 마지막 날짜 (측정에서 "오늘"로 씀, 월요일)
+TODAY = date(2026, 3, 2)
+
+
+# 가상 학생 명단 행
+def synthetic_roster(count):
+    rows = []
+    for idx in range(count):
+        rows.append([
+            f"{idx + 1:03d}", f"학생{idx + 1}", CLASS_TYPES[idx % len(CLASS_TYPES)],
+            f"{14 + idx % 6:02d}:{(idx % 2) * 30:02d}", 60, "TRUE",
+        ])
+    return rows
+
+
+# 가상 진도 기록 행 (학생마다 수업 요일에 한 줄, 날짜 순)
+def synthetic_history(roster, weeks, end):
+    rng = random.Random(0)
+    start = end - timedelta(weeks=weeks)
+    rows = []
+    day = start
+    while day <= end:
+        weekday = DAYS[day.weekday()]
+        for student in roster:
+            if weekday in class_days(student[2]):
+                rows.append([
+                    student[0], day.isoformat(), f"Day {rng.randint(1, 60)}", "Unit 3", "",
+                    "현재완료", f"p.{rng.randint(1, 200)}", "", "잘함", "워크북 2쪽", "TRUE",
+                ])
+        day += timedelta(days=1)
+    return rows
+
+
+# 가짜 스프레드시트에 명단 / 진도 / ID 발급 기록 채우기 (API 호출로 세지 않음)
+def seed_spreadsheet(client, roster, history):
+    spreadsheet = client.create(SPREADSHEET_NAME)
+    for title, header, rows in (
+        ("students", STUDENT_COLUMNS, roster),
+        ("progress", PROGRESS_COLUMNS, history),
+        (ID_SHEET, ID_BLOCK_COLUMNS, [[len(roster), "existing", ""]]),
+    ):
+        worksheet = spreadsheet.add_worksheet(title=title, rows=len(rows) + 1, cols=len(header))
+        worksheet.load([header] + rows)
+
+
+# 측정 대상 저장소 만들기
+def make_storage(backend_name, client, directory, quota):
+    scheduler = QuotaScheduler(reads_per_minute=quota or 10 ** 9, writes_per_minute=quota or 10 ** 9)
+    pool = SheetsPool(None, SPREADSHEET_NAME, client_factory=lambda: client, scheduler=scheduler)
+    remote = SheetsStorage(pool, ttl=3600)
+    if backend_name == "sheets":
+        return remote
+    local = SQLiteStorage(os.path.join(directory, f"bench-{time.monotonic_ns()}.db"))
+    # 백그라운드 작업자 없이 처음 한 번만 받아옴
+    synced = SyncedStorage(local, remote)
+    synced.worker.run_once()
+    return synced
+
+
+# 측정한 작업이 실제로 데이터를 찾았는지 확인 (빈 조회나 새 행 추가를 재지 않도록)
+def expect(found, name):
+    if not found:
+        raise RuntimeError(f"{name}: 찾은 데이터가 없습니다. 가상 데이터와 조회 조건을 확인하세요.")
+
+
+# op를 repeat번 실행해 지연 시간 / API 호출 수 / 메모리를 측정
+def measure(name, op, backend, repeat):
+    before = backend.snapshot()["calls"]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        op()
+        timings.append(time.perf_counter() - start)
+    calls = (backend.snapshot()["calls"] - before) / repeat
+
+    # 메모리는 시간 측정과 따로 한 번 더 실행해 잼 (tracemalloc이 실행을 느리게 하므로)
+    tracemalloc.start()
+    op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "op": name,
+        "api_calls": calls,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "max_ms": timings[-1] * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+# 시나리오 하나 (학생 수, 주 수, 저장소 종류) 측정
+def run_scenario(students, weeks, backend_name, args, directory):
+    today = TODAY
+    roster = synthetic_roster(students)
+    history = synthetic_history(roster, weeks, today)
+    backend = FakeBackend(latency=args.latency, per_kb=args.per_kb,
+                          reads_per_minute=args.quota, writes_per_minute=args.quota)
+    client = FakeClient(backend)
+    seed_spreadsheet(client, roster, history)
+
+    # 처음 읽기 (연결 + 전체 받기 / 로컬 DB 채우기), 매번 새 저장소로 재고 마지막 것을 계속 씀
+    opened = []
+
+    def cold_start():
+        storage = make_storage(backend_name, client, directory, args.quota)
+        storage.read("students")
+        storage.read("progress")
+        opened.append(storage)
+
+    results = [measure("cold_start", cold_start, backend, 1)]
+    storage = opened[-1]
+    students_df = storage.read("students")
+
+    weekday = DAYS[today.weekday()]
+    # 오늘 수업이 있는 학생 (오늘 진도와 최근 30일 기록이 있음)
+    attending = [row for row in roster if weekday in class_days(row[2])]
+    sample = [row[0] for row in random.Random(1).sample(attending, min(len(attending), 20))]
+    counter = iter(range(10 ** 9))
+
+    def tab_today():
+        schedule = ScheduleIndex(storage.read("students"))
+        today_students = schedule.students_on(weekday)
+        progress_grid(storage, today_students[today_students['class_type'] == CLASS_TYPES[0]], today.isoformat())
+
+    def tab_students():
+        schedule = ScheduleIndex(storage.read("students"))
+        for class_students in schedule.by_class_type.values():
+            class_students.iloc[:20].to_dict("records")
+
+    def tab_history():
+        records = storage.query_progress(random.choice(sample), today - timedelta(days=30), today)
+        expect(not records.empty, "tab:history")
+
+    def detail():
+        expect(storage.get_progress(random.choice(sample), today.isoformat()) is not None, "detail")
+
+    def write_existing():
+        storage.write("progress", {"homework": f"숙제 {next(counter)}"}, student_id=sample[0], date=today.isoformat())
+
+    def write_new():
+        day = today + timedelta(days=1 + next(counter))
+        storage.write("progress", {"homework": "새 숙제"}, student_id=sample[0], date=day.isoformat())
+
+    def write_class():
+        schedule = ScheduleIndex(students_df)
+        entries = [(student_id, today.isoformat(), {"homework": f"반 숙제 {next(counter)}"})
+                   for student_id in schedule.students_on(weekday)['student_id'].tolist()[:50]]
+        storage.write_many(entries)
+
+    for name, op in (
+        ("read_students", lambda: storage.read("students")),
+        ("read_progress", lambda: storage.read("progress")),
+        ("tab:today", tab_today),
+        ("tab:students", tab_students),
+        ("tab:history", tab_history),
+        ("detail", detail),
+        ("write_existing", write_existing),
+        ("write_new", write_new),
+        ("write_class", write_class),
+    ):
+        if name == "write_existing":
+            # 기존 행을 고치는 비용을 재므로 행 수가 늘면 안 됨 (확인은 측정 밖에서)
+            expect(storage.get_progress(sample[0], today.isoformat()) is not None, name)
+            rows = len(storage.read("progress"))
+        results.append(measure(name, op, backend, args.repeat))
+        if name == "write_existing":
+            expect(len(storage.read("progress")) == rows, name)
+
+    # 로컬 저장소는 밀린 변경을 시트로 밀어내는 비용도 잼
+    if backend_name == "sqlite":
+        results.append(measure("sync_push", storage.worker.push, backend, 1))
+
+    return {
+        "students": students,
+        "weeks": weeks,
+        "progress_rows": len(history),
+        "backend": backend_name,
+        "fake": backend.snapshot(),
+        "results": results,
+    }
+
+
+# 진도 표 표현 비교: 시트에서 받은 레코드 그대로(object 열) vs progress_frame
+# 표 하나의 메모리(deep)와 자주 쓰는 거르기 (학생 한 명의 최근 30일, 하루치, 기간 내 완료) 시간
+def compare_frames(history, today, repeat):
+    records = [as_record(PROGRESS_COLUMNS, row) for row in history]
+    start = time.perf_counter()
+    raw = pd.DataFrame(records)
+    raw_build = time.perf_counter() - start
+    start = time.perf_counter()
+    typed = progress_frame(records)
+    typed_build = time.perf_counter() - start
+
+    student_id = history[len(history) // 2][0] if history else "001"
+    day = today.isoformat()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    raw_filters = {
+        "student_30d": lambda: raw[(raw['student_id'] == numericise(student_id))
+                                   & (raw['date'] >= month_ago) & (raw['date'] <= day)],
+        "one_day": lambda: raw[raw['date'] == day],
+        "completed_30d": lambda: raw[(raw['date'] >= month_ago) & (raw['completed'] == "TRUE")],
+    }
+    key = normalize_student_id(student_id)
+    day_ts, month_ago_ts = pd.Timestamp(day), pd.Timestamp(month_ago)
+    typed_filters = {
+        "student_30d": lambda: typed[(typed['student_id'] == key)
+                                     & (typed['date'] >= month_ago_ts) & (typed['date'] <= day_ts)],
+        "one_day": lambda: typed[typed['date'] == day_ts],
+        "completed_30d": lambda: typed[(typed['date'] >= month_ago_ts) & typed['completed']],
+    }
+
+    def timed(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    rows = []
+    for name, frame, build, filters in (("object", raw, raw_build, raw_filters),
+                                        ("typed", typed, typed_build, typed_filters)):
+        rows.append({
+            "frame": name,
+            "memory_kb": frame.memory_usage(deep=True).sum() / 1024,
+            "build_ms": build * 1000,
+            **{f"{filter_name}_ms": timed(func) for filter_name, func in filters.items()},
+        })
+    return rows
+
+
+# 진도 표 표현 비교 출력
+def print_frames(students, weeks, rows):
+    print(f"\n== 진도 표 표현 / 학생 {students}명 / {weeks}주 ==")
+    columns = list(rows[0])[1:]
+    print(f"{'frame':<10}" + "".join(f"{col:>18}" for col in columns))
+    for row in rows:
+        print(f"{row['frame']:<10}" + "".join(f"{row[col]:>18.2f}" for col in columns))
+
+
+# 표 형태로 출력
+def print_scenario(scenario):
+    print(f"\n== {scenario['backend']} / 학생 {scenario['students']}명 / {scenario['weeks']}주 "
+          f"(진도 {scenario['progress_rows']}행) ==")
+    print(f"{'op':<16}{'api':>8}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}{'peak KB':>12}")
+    for result in scenario["results"]:
+        print(f"{result['op']:<16}{result['api_calls']:>8.1f}{result['p50_ms']:>12.2f}"
+              f"{result['p95_ms']:>12.2f}{result['max_ms']:>12.2f}{result['peak_kb']:>12.0f}")
+    fake = scenario["fake"]
+    print(f"가짜 시트: 호출 {fake['calls']}회, 받은 크기 {fake['bytes'] / 1024:.0f}KB, "
+          f"할당량 초과 {fake['quota_errors']}회, 흉내낸 지연 {fake['latency']:.2f}초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Google Sheets 위에서 앱의 읽기/쓰기/화면 경로 성능 측정")
+    parser.add_argument("--students", default=",".join(map(str, DEFAULT_STUDENTS)),
+                        help="학생 수 목록 (쉼표로 구분)")
+    parser.add_argument("--weeks", default=",".join(map(str, DEFAULT_WEEKS)),
+                        help="학생 수마다 쌓을 진도 기록 주 수 (쉼표로 구분, 학생 수 목록과 같은 길이)")
+    parser.add_argument("--backend", default="sheets,sqlite", help="저장소 종류 (sheets, sqlite)")
+    parser.add_argument("--latency", type=float, default=0.05, help="API 호출 하나의 지연 시간 (초)")
+    parser.add_argument("--per-kb", type=float, default=0.0005, help="응답 1KB당 추가 지연 시간 (초)")
+    parser.add_argument("--quota", type=int, default=None, help="분당 읽기/쓰기 할당량 (없으면 제한 없음)")
+    parser.add_argument("--repeat", type=int, default=10, help="동작마다 반복 횟수")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    students = [int(value) for value in args.students.split(",")]
+    weeks = [int(value) for value in args.weeks.split(",")]
+    if len(weeks) == 1:
+        weeks = weeks * len(students)
+    if len(weeks) != len(students):
+        parser.error("--weeks는 값 하나이거나 --students와 같은 길이여야 합니다.")
+
+    scenarios = []
+    with tempfile.TemporaryDirectory() as directory:
+        for count, week_count in zip(students, weeks):
+            frames = compare_frames(synthetic_history(synthetic_roster(count), week_count, TODAY), TODAY, args.repeat)
+            print_frames(count, week_count, frames)
+            scenarios.append({"students": count, "weeks": week_count, "frames": frames})
+            for backend_name in args.backend.split(","):
+                scenario = run_scenario(count, week_count, backend_name, args, directory)
+                print_scenario(scenario)
+                scenarios.append(scenario)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(scenarios, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
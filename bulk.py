@@ -0,0 +1,137 @@
+import io
+import re
+
+import pandas as pd
+
+from schedule import class_days
+from storage import PROGRESS_FIELDS, to_bool
+
+# 학생 가져오기 표에서 허용하는 머리글 (열 → 머리글 목록)
+STUDENT_IMPORT_COLUMNS = {
+    'name': ['name', '이름', '학생 이름'],
+    'class_type': ['class_type', '반', '반 종류'],
+    'time': ['time', '등원 시간', '시간'],
+    'class_duration': ['class_duration', '수업 시간', '수업 시간 (분)'],
+}
+
+# 수업 시간 허용 범위 (분, 학생 추가 폼과 같음)
+MIN_DURATION = 30
+MAX_DURATION = 180
+
+# Google Sheets 셀 하나에 넣을 수 있는 최대 글자 수
+CELL_LIMIT = 50000
+
+
+# 업로드한 파일 내용을 문자열로 (엑셀에서 저장한 CSV는 보통 CP949)
+def decode_upload(data):
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp949")
+
+
+# 붙여넣은 텍스트 / CSV 파일 내용을 표로 읽기
+# 엑셀에서 복사한 내용은 탭, CSV는 쉼표로 구분
+def read_table(text):
+    text = text.lstrip("\ufeff").strip()
+    if not text:
+        return pd.DataFrame()
+    sep = "\t" if "\t" in text.splitlines()[0] else ","
+    return pd.read_csv(io.StringIO(text), sep=sep, dtype=str, keep_default_na=False, skipinitialspace=True)
+
+
+# 등원 시간을 "HH:MM"으로 (알 수 없는 형식이면 None)
+def parse_time(value):
+    match = re.fullmatch(r"(\d{1,2}):(\d{2})(:\d{2})?", str(value).strip())
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+# 가져온 표를 검사해 추가할 학생 목록과 오류 목록을 반환
+# 오류가 있는 행만 빼고 나머지는 추가할 수 있음
+def validate_students(table, existing_df):
+    columns = {}
+    for col, aliases in STUDENT_IMPORT_COLUMNS.items():
+        found = [name for name in table.columns if str(name).strip() in aliases]
+        if not found:
+            return [], [f"'{aliases[1]}' 열이 없습니다. 머리글: {', '.join(a[1] for a in STUDENT_IMPORT_COLUMNS.values())}"]
+        columns[col] = found[0]
+
+    # 이미 등록된 학생과 같은 (이름, 반)은 중복으로 봄
+    seen = set()
+    if not existing_df.empty:
+        seen = set(zip(existing_df['name'].astype(str), existing_df['class_type'].astype(str)))
+
+    students = []
+    errors = []
+    for idx, row in enumerate(table.to_dict("records")):
+        # 1행은 머리글
+        line = idx + 2
+        name = str(row[columns['name']]).strip()
+        class_type = str(row[columns['class_type']]).strip()
+        start_time = parse_time(row[columns['time']])
+        duration = str(row[columns['class_duration']]).strip()
+
+        if not name:
+            errors.append(f"{line}행: 이름이 비어 있습니다.")
+            continue
+        if not class_days(class_type):
+            errors.append(f"{line}행 ({name}): 반 '{class_type}'에 수업 요일이 없습니다.")
+            continue
+        if start_time is None:
+            errors.append(f"{line}행 ({name}): 등원 시간 '{row[columns['time']]}'을(를) 알 수 없습니다. (예: 15:30)")
+            continue
+        if not duration.isdigit() or not MIN_DURATION <= int(duration) <= MAX_DURATION:
+            errors.append(f"{line}행 ({name}): 수업 시간은 {MIN_DURATION}~{MAX_DURATION}분이어야 합니다.")
+            continue
+        if (name, class_type) in seen:
+            errors.append(f"{line}행 ({name}): {class_type}반에 이미 같은 이름의 학생이 있습니다.")
+            continue
+
+        seen.add((name, class_type))
+        students.append({
+            'name': name,
+            'class_type': class_type,
+            'time': start_time,
+            'class_duration': int(duration),
+        })
+    return students, errors
+
+
+# 학생들의 특정 날짜 진도를 편집용 표로 (student_id 색인, 이름 + 진도 항목 열)
+def progress_grid(storage, students_df, date):
+    rows = []
+    for student in students_df.to_dict("records"):
+        record = storage.get_progress(student['student_id'], date) or {}
+        row = {'name': student['name']}
+        for col in PROGRESS_FIELDS:
+            value = record.get(col, False if col == "completed" else "")
+            row[col] = to_bool(value) if col == "completed" else str(value)
+        rows.append(row)
+    index = pd.Index(students_df['student_id'].tolist(), name='student_id')
+    return pd.DataFrame(rows, index=index, columns=['name'] + PROGRESS_FIELDS)
+
+
+# 편집 전후 표를 비교해 저장할 항목 [(student_id, date, 바뀐 값)]과 오류 목록을 반환
+def progress_changes(original, edited, date):
+    entries = []
+    errors = []
+    for student_id, row in edited.iterrows():
+        before = original.loc[student_id]
+        data = {}
+        for col in PROGRESS_FIELDS:
+            value = to_bool(row[col]) if col == "completed" else ("" if pd.isna(row[col]) else str(row[col]))
+            if value != before[col]:
+                data[col] = value
+        if not data:
+            continue
+        too_long = [col for col, value in data.items() if isinstance(value, str) and len(value) > CELL_LIMIT]
+        if too_long:
+            errors.append(f"{row['name']}: {', '.join(too_long)} 항목이 너무 깁니다. (최대 {CELL_LIMIT}자)")
+            continue
+        entries.append((student_id, date, data))
+    return entries, errors
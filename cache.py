@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pandas as pd
+from gspread.utils import numericise
+
+import tracing
+
+
+# 시트에 쓴 값을 get_all_records()가 돌려주는 모양으로 변환
+# (숫자 문자열은 숫자로, bool은 "TRUE"/"FALSE" 문자열로)
+def as_record(header, values):
+    record = {}
+    for col, value in zip(header, values):
+        if isinstance(value, bool):
+            value = "TRUE" if value else "FALSE"
+        elif isinstance(value, str):
+            value = numericise(value, default_blank="")
+        record[col] = value
+    return record
+
+
+# 시트 이름별 읽기 캐시
+# - TTL이 지나면 다시 불러오고, 쓰기가 일어나면 무효화하거나 바로 고침
+# - 시트마다 버전 번호를 두어 파생 데이터가 바뀐 시점을 알 수 있게 함
+class ReadCache:
+    def __init__(self, ttl=60, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._versions = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "invalidations": 0,
+            "patches": 0,
+        }
+
+    # 시트의 현재 버전
+    def version(self, sheet_name):
+        with self._lock:
+            return self._versions.get(sheet_name, 0)
+
+    def _bump(self, sheet_name):
+        self._versions[sheet_name] = self._versions.get(sheet_name, 0) + 1
+
+    # 캐시된 레코드 목록 반환, 없거나 만료되면 loader로 다시 불러옴
+    def records(self, sheet_name, loader):
+        with self._lock:
+            entry = self._entries.get(sheet_name)
+            now = self.clock()
+            if entry is not None and now - entry["fetched_at"] < self.ttl:
+                self.stats["hits"] += 1
+                tracing.count("cache_hits")
+                return entry["records"]
+            self.stats["refreshes" if entry is not None else "misses"] += 1
+            tracing.count("cache_misses")
+
+        return self.store(sheet_name, loader())
+
+    # 새로 받은 레코드 전체를 캐시에 저장
+    def store(self, sheet_name, records):
+        with self._lock:
+            self._entries[sheet_name] = {"records": list(records), "fetched_at": self.clock(), "frame": None}
+            self._bump(sheet_name)
+            return self._entries[sheet_name]["records"]
+
+    # 캐시된 DataFrame 반환 (같은 버전이면 다시 만들지 않음)
+    # build(records)로 DataFrame을 만듦 (열 형식 변환 등)
+    def frame(self, sheet_name, loader, build=pd.DataFrame):
+        records = self.records(sheet_name, loader)
+        with self._lock:
+            entry = self._entries.get(sheet_name)
+            if entry is None or entry["records"] is not records:
+                return build(records)
+            if entry["frame"] is None:
+                entry["frame"] = build(records)
+            return entry["frame"]
+
+    # 캐시 항목 삭제 (다음 읽기에서 다시 불러옴)
+    def invalidate(self, sheet_name=None):
+        with self._lock:
+            names = list(self._entries) if sheet_name is None else [sheet_name]
+            for name in names:
+                self._entries.pop(name, None)
+                self._bump(name)
+            self.stats["invalidations"] += 1
+
+    # 캐시된 레코드를 그 자리에서 고침
+    # func(records)는 레코드 목록을 직접 수정함, 캐시가 없으면 아무것도 하지 않음
+    def patch(self, sheet_name, func):
+        with self._lock:
+            entry = self._entries.get(sheet_name)
+            if entry is None:
+                return False
+            records = list(entry["records"])
+            func(records)
+            entry["records"] = records
+            entry["frame"] = None
+            self._bump(sheet_name)
+            self.stats["patches"] += 1
+            return True
+
+    # 레코드 하나 추가
+    def append(self, sheet_name, record):
+        return self.patch(sheet_name, lambda records: records.append(record))
+
+    # 조건에 맞는 첫 레코드를 값으로 갱신
+    def update_where(self, sheet_name, match, values):
+        def apply(records):
+            for idx, record in enumerate(records):
+                if match(record):
+                    records[idx] = {**record, **values}
+                    break
+        return self.patch(sheet_name, apply)
@@ -0,0 +1,218 @@
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+
+import pandas as pd
+
+from progress_store import progress_key
+from storage import PROGRESS_COLUMNS, PROGRESS_FIELDS, to_bool
+
+# 선택 라이브러리 (없으면 해당 형식만 빠짐)
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    from openpyxl.styles import Font
+except ImportError:
+    openpyxl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# 내보내기 열 (진도 열에 학생 이름/반을 붙임)
+EXPORT_COLUMNS = ['student_id', 'name', 'class_type'] + PROGRESS_COLUMNS[1:]
+
+# 형식별 (확장자, MIME)
+FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# 파일 나누기 기준
+SPLITS = {
+    "none": "하나의 파일",
+    "student": "학생별 (zip)",
+    "class_type": "반별 (zip)",
+}
+
+# 엑셀 파일 글꼴 (서버에는 packages.txt의 fonts-nanum으로 설치)
+XLSX_FONT = "NanumGothic"
+
+# 한 번에 읽어 오는 진도 행 수
+CHUNK_SIZE = 500
+
+
+# 설치된 라이브러리로 만들 수 있는 형식 목록
+def available_formats():
+    formats = ["csv"]
+    if openpyxl is not None:
+        formats.append("xlsx")
+    if pa is not None:
+        formats.append("parquet")
+    return formats
+
+
+# 파일 이름에 쓸 수 없는 문자 제거
+def safe_name(text):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(text)).strip("_") or "unknown"
+
+
+# CSV 파일 쓰기 (엑셀에서 한글이 깨지지 않도록 BOM을 붙임)
+class CSVWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8-sig", newline="")
+        self._file.write(",".join(EXPORT_COLUMNS) + "\n")
+
+    def write(self, frame):
+        frame.to_csv(self._file, index=False, header=False)
+
+    def close(self):
+        self._file.close()
+
+
+# XLSX 파일 쓰기
+# write_only 모드라 행을 바로 임시 파일로 내보내며, 셀마다 한글 글꼴을 지정
+class XLSXWriter:
+    def __init__(self, path):
+        self.path = path
+        self._book = openpyxl.Workbook(write_only=True)
+        self._sheet = self._book.create_sheet("progress")
+        self._font = Font(name=XLSX_FONT)
+        self._header_font = Font(name=XLSX_FONT, bold=True)
+        self._sheet.append([self._cell(col, self._header_font) for col in EXPORT_COLUMNS])
+
+    def _cell(self, value, font):
+        if isinstance(value, str):
+            # 엑셀이 허용하지 않는 제어 문자 제거
+            value = ILLEGAL_CHARACTERS_RE.sub("", value)
+        cell = WriteOnlyCell(self._sheet, value=value)
+        cell.font = font
+        return cell
+
+    def write(self, frame):
+        for row in frame.itertuples(index=False, name=None):
+            self._sheet.append([self._cell(value, self._font) for value in row])
+
+    def close(self):
+        self._book.save(self.path)
+
+
+# Parquet 파일 쓰기 (묶음마다 row group 하나)
+class ParquetWriter:
+    def __init__(self, path):
+        schema = pa.schema(
+            [(col, pa.bool_() if col == "completed" else pa.string()) for col in EXPORT_COLUMNS]
+        )
+        self._schema = schema
+        self._writer = pq.ParquetWriter(path, schema)
+
+    def write(self, frame):
+        self._writer.write_table(pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {
+    "csv": CSVWriter,
+    "xlsx": XLSXWriter,
+    "parquet": ParquetWriter,
+}
+
+
+# 학생 키 → (student_id, 이름, 반)
+def roster_lookup(students_df):
+    lookup = {}
+    for student in students_df.to_dict("records"):
+        key = progress_key(student['student_id'], "")[0]
+        lookup[key] = (str(student['student_id']), str(student['name']), str(student['class_type']))
+    return lookup
+
+
+# 진도 묶음을 내보내기 열 구성으로 변환 (문자열 / bool로 통일)
+def export_frame(frame, lookup):
+    keys = [progress_key(student_id, "")[0] for student_id in frame["student_id"]]
+    students = [lookup.get(key, (key, "", "")) for key in keys]
+    result = frame[PROGRESS_COLUMNS].copy()
+    result["student_id"] = [student[0] for student in students]
+    result.insert(1, "name", [student[1] for student in students])
+    result.insert(2, "class_type", [student[2] for student in students])
+    for col in ["date"] + PROGRESS_FIELDS[:-1]:
+        result[col] = result[col].fillna("").astype(str)
+    result["completed"] = result["completed"].map(to_bool).astype(bool)
+    return result[EXPORT_COLUMNS]
+
+
+# 행이 들어갈 파일 묶음 이름
+def group_name(row, split):
+    if split == "student":
+        return f"{safe_name(row['student_id'])}_{safe_name(row['name'])}"
+    if split == "class_type":
+        return f"{safe_name(row['class_type'] or '미지정')}반"
+    return "진도기록"
+
+
+# 기간 내 모든 학생의 진도를 파일로 내보냄
+# - 저장소에서 CHUNK_SIZE개씩 읽어 바로 파일에 쓰므로 행 수와 관계없이 메모리 사용량이 일정
+# - split이 "student" / "class_type"이면 묶음마다 파일을 만들어 zip 하나로 묶음
+# 반환값: {"path", "file_name", "mime", "rows", "files"} (다 쓰면 remove_export로 정리)
+def export_progress(storage, students_df, start_date, end_date, fmt="csv", split="none", chunk_size=CHUNK_SIZE):
+    if fmt not in available_formats():
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    extension, mime = FORMATS[fmt]
+    directory = tempfile.mkdtemp(prefix="progress-export-")
+    lookup = roster_lookup(students_df)
+    writers = {}
+    paths = {}
+    rows = 0
+    try:
+        for chunk in storage.iter_progress(start_date, end_date, chunk_size=chunk_size):
+            frame = export_frame(chunk, lookup)
+            names = pd.Series(
+                [group_name(row, split) for row in frame[["student_id", "name", "class_type"]].to_dict("records")],
+                index=frame.index,
+            )
+            for name, group in frame.groupby(names, sort=False):
+                if name not in writers:
+                    if split == "student":
+                        # 학생 순으로 오므로 앞 학생의 파일은 바로 닫음
+                        for writer in writers.values():
+                            writer.close()
+                        writers.clear()
+                    paths[name] = os.path.join(directory, f"{name}.{extension}")
+                    writers[name] = WRITERS[fmt](paths[name])
+                writers[name].write(group)
+            rows += len(frame)
+        if not paths:
+            # 기록이 없어도 헤더만 있는 파일을 만듦
+            name = group_name({}, "none")
+            paths[name] = os.path.join(directory, f"{name}.{extension}")
+            writers[name] = WRITERS[fmt](paths[name])
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    period = f"{start_date.isoformat()}_{end_date.isoformat()}"
+    if split == "none":
+        path = paths[group_name({}, "none")]
+        return {"path": path, "file_name": f"진도기록_{period}.{extension}", "mime": mime,
+                "rows": rows, "files": 1}
+
+    path = os.path.join(directory, "export.zip")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, member in paths.items():
+            archive.write(member, f"{name}.{extension}")
+            os.remove(member)
+    return {"path": path, "file_name": f"진도기록_{split}_{period}.zip", "mime": "application/zip",
+            "rows": rows, "files": len(paths)}
+
+
+# 내보내기 파일과 임시 폴더 삭제
+def remove_export(export):
+    shutil.rmtree(os.path.dirname(export["path"]), ignore_errors=True)
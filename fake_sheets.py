@@ -0,0 +1,357 @@
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+import gspread
+import requests
+from gspread.cell import Cell
+from gspread.utils import a1_range_to_grid_range, numericise_all, rowcol_to_a1
+
+# 오프라인 실행/테스트용 Google Sheets 가짜 구현
+# 이 앱이 쓰는 gspread Client / Spreadsheet / Worksheet 기능만 메모리에서 흉내냄
+# FakeBackend로 호출마다 지연 시간과 분당 할당량을 흉내낼 수 있음 (기본값은 지연/할당량 없음)
+
+
+# 실제 API가 할당량을 넘었을 때 돌려주는 것과 같은 429 오류
+def quota_error(retry_after=None):
+    response = requests.Response()
+    response.status_code = 429
+    response._content = json.dumps({
+        "error": {"code": 429, "message": "Quota exceeded (fake)", "status": "RESOURCE_EXHAUSTED"},
+    }).encode("utf-8")
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return gspread.exceptions.APIError(response)
+
+
+# 응답 본문 (UTF-8 JSON, 목록/사전이 아니면 빈 본문)
+def response_body(value):
+    if not isinstance(value, (list, dict)):
+        return b""
+    return json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+
+
+# gspread client의 http_client.session 자리 (응답 훅만 흉내냄)
+class FakeSession:
+    def __init__(self):
+        self.hooks = {"response": []}
+
+    # 등록된 응답 훅에 본문만 채운 응답을 넘김
+    def respond(self, body):
+        hooks = list(self.hooks["response"])
+        if not hooks:
+            return
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        for hook in hooks:
+            hook(response)
+
+
+class FakeHTTPClient:
+    def __init__(self, session):
+        self.session = session
+
+
+# 가짜 시트의 API 호출 모델
+# - 호출마다 latency초 + 응답 1KB당 per_kb초만큼 기다림
+# - 최근 60초 동안의 읽기/쓰기 호출 수가 분당 할당량을 넘으면 429 오류
+# - 메서드별 호출 수, 받은 크기, 할당량 초과 횟수를 기록
+# - 응답마다 session의 응답 훅을 부름 (실제 client의 requests 세션처럼)
+class FakeBackend:
+    def __init__(self, latency=0.0, per_kb=0.0, reads_per_minute=None, writes_per_minute=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.latency = latency
+        self.per_kb = per_kb
+        self.limits = {"read": reads_per_minute, "write": writes_per_minute}
+        self.clock = clock
+        self.sleep = sleep
+        self.session = FakeSession()
+        self._lock = threading.Lock()
+        self._recent = {"read": deque(), "write": deque()}
+        self.stats = {
+            "calls": 0,
+            "reads": 0,
+            "writes": 0,
+            "bytes": 0,
+            "quota_errors": 0,
+            "latency": 0.0,
+        }
+        self.methods = {}
+
+    # 할당량 확인 후 호출 하나 기록, 넘었으면 429 오류
+    def _admit(self, kind):
+        limit = self.limits[kind]
+        with self._lock:
+            now = self.clock()
+            recent = self._recent[kind]
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if limit is not None and len(recent) >= limit:
+                self.stats["quota_errors"] += 1
+                raise quota_error(retry_after=max(1, int(60 - (now - recent[0])) + 1))
+            recent.append(now)
+
+    # func 실행을 API 호출 하나로 처리
+    def call(self, method, kind, func):
+        self._admit(kind)
+        result = func()
+        body = response_body(result)
+        size = len(body)
+        delay = self.latency + self.per_kb * size / 1024
+        if delay > 0:
+            self.sleep(delay)
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["reads" if kind == "read" else "writes"] += 1
+            self.stats["bytes"] += size
+            self.stats["latency"] += delay
+            self.methods[method] = self.methods.get(method, 0) + 1
+        self.session.respond(body)
+        return result
+
+    # 지금까지의 기록 (복사본)
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "methods": dict(self.methods)}
+
+
+# 메서드를 API 호출 하나로 기록하는 데코레이터 (kind: "read" / "write")
+def api_call(kind):
+    def decorate(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            return self._backend.call(func.__name__, kind, lambda: func(self, *args, **kwargs))
+        return wrapper
+    return decorate
+
+
+# 시트가 돌려주는 형식(FORMATTED_VALUE)으로 값 변환
+def formatted(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# "sheet!A1:B2" 형태의 범위를 0부터 시작하는 (시작 행, 끝 행, 시작 열, 끝 열)로 변환
+# 끝이 열려 있으면 None
+def grid_bounds(range_name):
+    grid = a1_range_to_grid_range(range_name.split("!")[-1])
+    return (
+        grid.get("startRowIndex", 0),
+        grid.get("endRowIndex"),
+        grid.get("startColumnIndex", 0),
+        grid.get("endColumnIndex"),
+    )
+
+
+class FakeWorksheet:
+    def __init__(self, title, rows=100, cols=20, backend=None):
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self._cells = []
+        self._lock = threading.RLock()
+        self._backend = backend or FakeBackend()
+
+    # 값이 있는 마지막 행까지의 행 수
+    def _used_rows(self):
+        rows = len(self._cells)
+        while rows and not any(formatted(v) for v in self._cells[rows - 1]):
+            rows -= 1
+        return rows
+
+    # 셀 하나에 값 쓰기 (필요하면 격자를 늘림)
+    def _set(self, row, col, value):
+        while len(self._cells) <= row:
+            self._cells.append([])
+        cells = self._cells[row]
+        while len(cells) <= col:
+            cells.append("")
+        cells[col] = value
+        self.row_count = max(self.row_count, row + 1)
+        self.col_count = max(self.col_count, col + 1)
+
+    # 범위 안의 값 읽기 (API처럼 뒤쪽 빈 행/열은 잘라냄)
+    def _read(self, range_name=None):
+        with self._lock:
+            start_row, end_row, start_col, end_col = grid_bounds(range_name) if range_name else (0, None, 0, None)
+            used = self._used_rows()
+            end_row = used if end_row is None else min(end_row, used)
+            values = []
+            for row in range(start_row, end_row):
+                cells = self._cells[row] if row < len(self._cells) else []
+                stop = len(cells) if end_col is None else min(end_col, len(cells))
+                row_values = [formatted(v) for v in cells[start_col:stop]]
+                while row_values and row_values[-1] == "":
+                    row_values.pop()
+                values.append(row_values)
+            while values and not values[-1]:
+                values.pop()
+            return values
+
+    # 범위에 값 쓰기
+    def _write(self, range_name, values):
+        with self._lock:
+            start_row, _, start_col, _ = grid_bounds(range_name)
+            for r, row_values in enumerate(values):
+                for c, value in enumerate(row_values):
+                    self._set(start_row + r, start_col + c, value)
+
+    # 시트 전체 값 (행 길이를 맞춤)
+    def _all_values(self):
+        values = self._read()
+        width = max((len(row) for row in values), default=0)
+        return [row + [""] * (width - len(row)) for row in values]
+
+    # API를 거치지 않고 값 채우기 (벤치마크/테스트 준비용)
+    def load(self, values, start_row=1):
+        with self._lock:
+            for offset, row_values in enumerate(values):
+                for col, value in enumerate(row_values):
+                    self._set(start_row - 1 + offset, col, value)
+
+    @api_call("read")
+    def get(self, range_name=None):
+        return self._read(range_name)
+
+    @api_call("read")
+    def batch_get(self, ranges):
+        return [self._read(range_name) for range_name in ranges]
+
+    @api_call("read")
+    def get_all_values(self):
+        return self._all_values()
+
+    @api_call("read")
+    def get_all_records(self):
+        values = self._all_values()
+        if not values:
+            return []
+        header = values[0]
+        return [dict(zip(header, numericise_all(row, default_blank=""))) for row in values[1:]]
+
+    @api_call("read")
+    def row_values(self, row):
+        values = self._read(f"A{row}:{rowcol_to_a1(row, max(self.col_count, 1))}")
+        return values[0] if values else []
+
+    @api_call("read")
+    def col_values(self, col):
+        with self._lock:
+            values = [formatted(row[col - 1]) if len(row) >= col else "" for row in self._cells[:self._used_rows()]]
+            while values and values[-1] == "":
+                values.pop()
+            return values
+
+    # gspread 5 방식(range, values)과 6 방식(values, range) 모두 받음
+    @api_call("write")
+    def update(self, values, range_name=None, **kwargs):
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        self._write(range_name or "A1", values)
+        return {"updatedRange": f"{self.title}!{range_name}"}
+
+    @api_call("write")
+    def batch_update(self, data, **kwargs):
+        for item in data:
+            self._write(item["range"], item["values"])
+        return {"totalUpdatedCells": sum(len(row) for item in data for row in item["values"])}
+
+    @api_call("write")
+    def update_cell(self, row, col, value):
+        with self._lock:
+            self._set(row - 1, col - 1, value)
+
+    # 마지막 행 뒤에 행 추가
+    def _append_rows(self, values):
+        with self._lock:
+            start = self._used_rows() + 1
+            for offset, row_values in enumerate(values):
+                for col, value in enumerate(row_values):
+                    self._set(start - 1 + offset, col, value)
+            end = start + len(values) - 1
+            width = max((len(row) for row in values), default=1)
+            return {
+                "updates": {
+                    "updatedRange": f"{self.title}!A{start}:{rowcol_to_a1(end, width)}",
+                    "updatedRows": len(values),
+                }
+            }
+
+    @api_call("write")
+    def append_rows(self, values, value_input_option=None, insert_data_option=None, table_range=None, **kwargs):
+        return self._append_rows(values)
+
+    @api_call("write")
+    def append_row(self, values, value_input_option=None, insert_data_option=None, table_range=None, **kwargs):
+        return self._append_rows([values])
+
+    @api_call("read")
+    def find(self, query, in_row=None, in_column=None):
+        with self._lock:
+            for r, row in enumerate(self._cells[:self._used_rows()]):
+                if in_row is not None and r + 1 != in_row:
+                    continue
+                for c, value in enumerate(row):
+                    if in_column is not None and c + 1 != in_column:
+                        continue
+                    if formatted(value) == str(query):
+                        return Cell(r + 1, c + 1, formatted(value))
+            return None
+
+
+class FakeSpreadsheet:
+    def __init__(self, title, backend=None):
+        self.title = title
+        self._worksheets = {}
+        self._lock = threading.RLock()
+        self._backend = backend or FakeBackend()
+
+    @api_call("read")
+    def worksheets(self, exclude_hidden=False):
+        with self._lock:
+            return list(self._worksheets.values())
+
+    @api_call("read")
+    def worksheet(self, title):
+        with self._lock:
+            if title not in self._worksheets:
+                raise gspread.exceptions.WorksheetNotFound(title)
+            return self._worksheets[title]
+
+    @api_call("write")
+    def add_worksheet(self, title, rows, cols, index=None):
+        with self._lock:
+            worksheet = FakeWorksheet(title, rows, cols, backend=self._backend)
+            self._worksheets[title] = worksheet
+            return worksheet
+
+
+# 같은 client에서 만든 스프레드시트 / 워크시트는 backend 하나를 같이 씀
+class FakeClient:
+    def __init__(self, backend=None):
+        self._spreadsheets = {}
+        self._lock = threading.RLock()
+        self._backend = backend or FakeBackend()
+        self.http_client = FakeHTTPClient(self._backend.session)
+
+    @api_call("read")
+    def open(self, title, folder_id=None):
+        with self._lock:
+            if title not in self._spreadsheets:
+                raise gspread.exceptions.SpreadsheetNotFound(title)
+            return self._spreadsheets[title]
+
+    @api_call("write")
+    def create(self, title, folder_id=None):
+        with self._lock:
+            spreadsheet = FakeSpreadsheet(title, backend=self._backend)
+            self._spreadsheets[title] = spreadsheet
+            return spreadsheet
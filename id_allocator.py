@@ -0,0 +1,85 @@
+import threading
+import uuid
+from datetime import datetime
+
+from gspread.utils import numericise
+
+from sheets import appended_row_number
+
+# 학생 ID 발급 기록 시트
+ID_SHEET = "id_blocks"
+ID_BLOCK_COLUMNS = ['count', 'reserved_by', 'reserved_at']
+
+# 발급 기록의 첫 데이터 행 번호 (1행은 헤더)
+FIRST_BLOCK_ROW = 2
+
+
+# 학생 ID 번호 → 표시 형식 ("001")
+def format_student_id(number):
+    return f"{number:03d}"
+
+
+# 학생 ID를 한 가지 형식으로 (시트에서 읽은 값은 "001" → 1처럼 숫자로 바뀌어 있을 수 있음)
+# 숫자 ID는 "001" 형식, 숫자가 아닌 ID는 앞뒤 공백만 뺀 문자열
+def normalize_student_id(value):
+    text = str(value).strip()
+    number = numericise(text)
+    return format_student_id(number) if isinstance(number, int) else text
+
+
+# 기존 학생 ID 중 가장 큰 번호 (숫자가 아닌 ID는 무시)
+def max_student_id(student_ids):
+    numbers = [numericise(str(student_id)) for student_id in student_ids]
+    return max((number for number in numbers if isinstance(number, int)), default=0)
+
+
+# 시트에 남기는 발급 기록으로 학생 ID 번호 묶음을 예약
+# - 예약할 때마다 발급 기록 시트에 (개수, 예약자, 시각) 한 줄을 추가
+# - 시트의 추가(append)는 순서대로 처리되므로 추가된 행 번호가 곧 예약 순서
+# - 내 행 앞에 있는 개수를 모두 더한 다음 번호부터가 내 묶음
+#   (앞 행들의 합은 기억해 두고 그 뒤에 새로 생긴 행만 읽음)
+# 동시에 여러 곳에서 예약해도 번호가 겹치지 않고, 학생 명단 전체를 읽지 않음
+class SheetIdAllocator:
+    def __init__(self, pool, sheet_name=ID_SHEET):
+        self.pool = pool
+        self.sheet_name = sheet_name
+        self.owner = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._known_row = FIRST_BLOCK_ROW - 1
+        self._known_total = 0
+        self.stats = {
+            "reservations": 0,
+            "reserved": 0,
+            "rows_read": 0,
+        }
+
+    # count개의 연속된 번호를 예약해 번호 목록을 반환
+    def reserve(self, count):
+        if count <= 0:
+            return []
+        with self._lock:
+            row = [count, self.owner, datetime.now().isoformat(timespec="seconds")]
+            response = self.pool.run(self.sheet_name, lambda sheet: sheet.append_rows([row], table_range="A1"),
+                                     kind="write")
+            row_number = appended_row_number(response)
+
+            # 기억하고 있는 행 뒤부터 내 행 앞까지의 개수만 읽음
+            total = self._known_total
+            if row_number - 1 > self._known_row:
+                block_range = f"A{self._known_row + 1}:A{row_number - 1}"
+                values = self.pool.run(self.sheet_name, lambda sheet: sheet.get(block_range))
+                total += sum(int(numericise(str(value[0]))) for value in values if value and value[0] != "")
+                self.stats["rows_read"] += row_number - 1 - self._known_row
+
+            start = total + 1
+            self._known_row = row_number
+            self._known_total = total + count
+            self.stats["reservations"] += 1
+            self.stats["reserved"] += count
+            return list(range(start, start + count))
+
+    # 발급 기록 시트가 새로 만들어졌을 때 기억해 둔 합계를 버림
+    def invalidate(self):
+        with self._lock:
+            self._known_row = FIRST_BLOCK_ROW - 1
+            self._known_total = 0
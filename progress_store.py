@@ -0,0 +1,345 @@
+import bisect
+import re
+import threading
+from datetime import date, datetime
+
+from gspread.utils import numericise, rowcol_to_a1
+
+from cache import as_record
+
+# 진도 시트의 첫 데이터 행 번호 (1행은 헤더)
+FIRST_DATA_ROW = 2
+
+
+# 시트에 직접 입력된 날짜에서 허용하는 형식
+DATE_FORMATS = ["%Y/%m/%d", "%Y.%m.%d", "%Y. %m. %d"]
+
+
+# 색인 키 (시트에서 읽은 값은 "001" → 1처럼 숫자로 바뀌어 있을 수 있어 같은 형태로 통일)
+def progress_key(student_id, date):
+    return (str(numericise(str(student_id))), str(date))
+
+
+# 레코드의 색인 키
+def record_key(record):
+    return progress_key(record["student_id"], record["date"])
+
+
+# 헤더 행에서 뒤쪽 빈 칸을 뺀 열 이름 목록
+# get_all_values()는 가장 긴 행에 맞춰 빈 칸을 채우고, 범위 읽기는 뒤쪽 빈 칸을 잘라내므로
+# 헤더 오른쪽 칸에 적힌 메모 등과 관계없이 같은 헤더가 되도록 맞춤
+def trim_header(header):
+    header = list(header)
+    while header and str(header[-1]).strip() == "":
+        header.pop()
+    return header
+
+
+# 날짜 값을 date로 변환 (알 수 없는 형식이면 None)
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+# (student_id, date) → 시트 행 번호 / 레코드 색인
+# - 처음 한 번 전체 레코드로 만들고, 추가/수정 때는 그 자리에서 고침
+# - 새로 받은 레코드의 행 수가 달라졌을 때만 다시 만듦
+# - 학생별로 (날짜, 행 번호)를 날짜 순으로 들고 있어 기간 조회도 바로 가능
+class ProgressIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rows = None
+        self._records = []
+        self._by_student = {}
+        self.stats = {
+            "lookups": 0,
+            "rebuilds": 0,
+            "appends": 0,
+            "updates": 0,
+        }
+
+    # 색인이 만들어졌는지 여부
+    @property
+    def built(self):
+        return self._rows is not None
+
+    # 색인이 담고 있는 데이터 행 수
+    @property
+    def row_count(self):
+        return len(self._records)
+
+    # 다음에 추가될 행 번호
+    @property
+    def next_row(self):
+        return FIRST_DATA_ROW + len(self._records)
+
+    # 전체 레코드로 색인 새로 만들기
+    def rebuild(self, records):
+        with self._lock:
+            rows = {}
+            by_student = {}
+            for idx, record in enumerate(records):
+                key = record_key(record)
+                # 같은 키가 여러 번 있으면 첫 행을 사용
+                if key in rows:
+                    continue
+                rows[key] = FIRST_DATA_ROW + idx
+                # 날짜는 색인을 만들 때 한 번만 해석
+                day = parse_date(record["date"])
+                if day is not None:
+                    by_student.setdefault(key[0], []).append((day, rows[key]))
+            for dates in by_student.values():
+                dates.sort()
+            self._rows = rows
+            self._by_student = by_student
+            self._records = list(records)
+            self.stats["rebuilds"] += 1
+
+    # 색인이 들고 있는 레코드 목록 (행 순서)
+    @property
+    def records(self):
+        return self._records
+
+    # 다음 접근 때 다시 만들도록 색인 비우기
+    def invalidate(self):
+        with self._lock:
+            self._rows = None
+            self._records = []
+            self._by_student = {}
+
+    # 시트 행 번호 (없으면 None)
+    def row_number(self, student_id, date):
+        with self._lock:
+            self.stats["lookups"] += 1
+            if self._rows is None:
+                return None
+            return self._rows.get(progress_key(student_id, date))
+
+    # 레코드 (없으면 None)
+    def get(self, student_id, date):
+        with self._lock:
+            row = self.row_number(student_id, date)
+            if row is None:
+                return None
+            return self._records[row - FIRST_DATA_ROW]
+
+    # 추가된 행 반영
+    # 행 번호가 예상과 다르면 그 사이 다른 곳에서 행이 추가된 것이므로 색인을 비움
+    def append(self, row_number, record):
+        with self._lock:
+            if self._rows is None or row_number != self.next_row:
+                self.invalidate()
+                return False
+            key = record_key(record)
+            if key not in self._rows:
+                self._rows[key] = row_number
+                day = parse_date(record["date"])
+                if day is not None:
+                    bisect.insort(self._by_student.setdefault(key[0], []), (day, row_number))
+            self._records.append(record)
+            self.stats["appends"] += 1
+            return True
+
+    # 학생 키의 기간 내 행 번호 (날짜 순)
+    def _rows_for(self, key, start, end):
+        dates = self._by_student.get(key, [])
+        lo = bisect.bisect_left(dates, (start, 0))
+        hi = bisect.bisect_right(dates, (end, float("inf")))
+        return [row for _, row in dates[lo:hi]]
+
+    # 학생의 기간 내 행 번호 (날짜 순)
+    def rows_between(self, student_id, start, end):
+        with self._lock:
+            self.stats["lookups"] += 1
+            return self._rows_for(progress_key(student_id, "")[0], start, end)
+
+    # 여러 학생의 기간 내 행 번호 (학생 순, 학생마다 날짜 순)
+    # student_ids가 None이면 모든 학생
+    def rows_in_range(self, start, end, student_ids=None):
+        with self._lock:
+            self.stats["lookups"] += 1
+            if student_ids is None:
+                keys = sorted(self._by_student)
+            else:
+                keys = sorted({progress_key(student_id, "")[0] for student_id in student_ids})
+            rows = []
+            for key in keys:
+                rows.extend(self._rows_for(key, start, end))
+            return rows
+
+    # 행 번호의 레코드
+    def record_at(self, row_number):
+        with self._lock:
+            return self._records[row_number - FIRST_DATA_ROW]
+
+    # 기존 행의 값 갱신
+    def update(self, row_number, values):
+        with self._lock:
+            if self._rows is None:
+                return
+            idx = row_number - FIRST_DATA_ROW
+            self._records[idx] = {**self._records[idx], **values}
+            self.stats["updates"] += 1
+
+
+# 열 번호 → 열 문자 (11 → "K")
+def column_letter(col):
+    return re.sub(r"\d", "", rowcol_to_a1(1, col))
+
+
+# 진도 시트의 로컬 사본을 증분으로 맞추는 동기화
+# - 마지막으로 알던 행 뒤에 새로 생긴 행과, 바뀐 것으로 표시된 행만 받아옴
+# - 헤더가 다르거나 마지막 행이 어긋나면 전체를 다시 받음
+class ProgressSync:
+    def __init__(self, index, sheet_name="progress"):
+        self.index = index
+        self.sheet_name = sheet_name
+        self.header = None
+        self._dirty = set()
+        # take_changes() 뒤에 새로 받거나 다시 받은 행 번호 (None이면 전체를 다시 받았음)
+        self._changes = None
+        self._lock = threading.RLock()
+        self.last_sync = None
+        self.stats = {
+            "full_syncs": 0,
+            "delta_syncs": 0,
+            "rows_syncs": 0,
+            "rows_transferred": 0,
+            "bytes_transferred": 0,
+        }
+
+    # 다음 동기화 때 다시 받아올 행 표시
+    def mark_dirty(self, row_number):
+        with self._lock:
+            self._dirty.add(row_number)
+
+    # 로컬 사본을 버리고 다음에 전체를 다시 받게 함
+    def invalidate(self):
+        with self._lock:
+            self.header = None
+            self._dirty.clear()
+            self._changes = None
+            self.index.invalidate()
+
+    # 바뀐 행 번호 기록 (전체를 다시 받은 뒤로 아직 가져가지 않았으면 그대로 전체)
+    def _note_changes(self, rows):
+        if self._changes is not None:
+            self._changes.update(rows)
+
+    # 지난번 take_changes() 뒤에 새로 받거나 다시 받은 레코드 (행 순서)
+    # 그 사이 전체를 다시 받았으면 None (받는 쪽에서 전체 레코드를 씀)
+    def take_changes(self):
+        with self._lock:
+            rows, self._changes = self._changes, set()
+            if rows is None:
+                return None
+            return [self.index.record_at(row) for row in sorted(rows) if row < self.index.next_row]
+
+    # 동기화 결과 기록
+    def _record(self, mode, rows, size):
+        self.last_sync = {"mode": mode, "rows": rows, "bytes": size}
+        self.stats[f"{mode}_syncs"] += 1
+        self.stats["rows_transferred"] += rows
+        self.stats["bytes_transferred"] += size
+
+    # 행 값을 헤더 길이에 맞춰 레코드로 변환 (헤더 밖의 열은 버림)
+    def _as_record(self, row):
+        return as_record(self.header, list(row) + [""] * (len(self.header) - len(row)))
+
+    # 로컬 사본을 최신으로 맞추고 레코드 목록 반환
+    # 기존 행이 시트에서 직접 고쳐진 것은 증분으로 알 수 없으므로 full=True로 전체를 받음
+    def refresh(self, pool, full=False):
+        with self._lock:
+            if full or not self.header or not self.index.built or not self._delta(pool):
+                self._full(pool)
+            return self.index.records
+
+    # 주어진 행만 시트에서 다시 받아 로컬 사본에 반영, 성공하면 True
+    # 연속된 행은 한 범위로 묶어 한 번의 batch_get으로 받음
+    def fetch_rows(self, pool, rows):
+        with self._lock:
+            if not rows:
+                return True
+            last_col = column_letter(len(self.header))
+            spans = []
+            for row in sorted(rows):
+                if spans and spans[-1][1] == row - 1:
+                    spans[-1][1] = row
+                else:
+                    spans.append([row, row])
+            ranges = [f"A{start}:{last_col}{end}" for start, end in spans]
+            received = pool.bytes_received()
+            results = pool.run(self.sheet_name, lambda sheet: sheet.batch_get(ranges))
+
+            fetched = 0
+            for (start, end), values in zip(spans, results):
+                for offset in range(end - start + 1):
+                    row = start + offset
+                    record = self._as_record(values[offset] if offset < len(values) else [])
+                    known = self.index.record_at(row)
+                    # 행 위치가 바뀌었으면 로컬 사본을 믿을 수 없음
+                    if record_key(record) != record_key(known):
+                        self.invalidate()
+                        return False
+                    self.index.update(row, record)
+                    self._note_changes([row])
+                    fetched += 1
+            self._record("rows", fetched, pool.bytes_received() - received)
+            return True
+
+    # 전체 다시 받기
+    def _full(self, pool):
+        received = pool.bytes_received()
+        values = pool.run(self.sheet_name, lambda sheet: sheet.get_all_values())
+        self.header = trim_header(values[0]) if values else []
+        self.index.rebuild([self._as_record(row) for row in values[1:]])
+        self._dirty.clear()
+        self._changes = None
+        self._record("full", max(len(values) - 1, 0), pool.bytes_received() - received)
+
+    # 증분 받기, 로컬 사본과 어긋나면 False
+    def _delta(self, pool):
+        last_col = column_letter(len(self.header))
+        last_row = self.index.next_row - 1
+        dirty = sorted(row for row in self._dirty if row <= last_row)
+        ranges = [f"A1:{last_col}1", f"A{last_row}:{last_col}{last_row}", f"A{last_row + 1}:{last_col}"]
+        ranges += [f"A{row}:{last_col}{row}" for row in dirty]
+
+        # 헤더, 마지막으로 알던 행, 새 행, 바뀐 행을 한 번에 받음
+        received = pool.bytes_received()
+        header_values, last_values, new_values, *dirty_values = pool.run(
+            self.sheet_name, lambda sheet: sheet.batch_get(ranges)
+        )
+        size = pool.bytes_received() - received
+
+        if trim_header(header_values[0] if header_values else []) != self.header:
+            return False
+        if self.index.row_count:
+            # 마지막으로 알던 행의 키가 그대로인지 확인 (행 삭제/삽입 감지)
+            last = self._as_record(last_values[0] if last_values else [])
+            known = self.index.records[-1]
+            if record_key(last) != record_key(known):
+                return False
+
+        for row, values in zip(dirty, dirty_values):
+            self.index.update(row, self._as_record(values[0] if values else []))
+        for offset, values in enumerate(new_values):
+            self.index.append(last_row + 1 + offset, self._as_record(values))
+        self._note_changes(dirty)
+        self._note_changes(range(last_row + 1, last_row + 1 + len(new_values)))
+        self._dirty.clear()
+        self._record("delta", len(new_values) + len(dirty), size)
+        return True
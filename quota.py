@@ -0,0 +1,201 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import google.auth.exceptions
+import gspread
+import requests
+
+import tracing
+
+# Google Sheets API 기본 할당량 (서비스 계정 한 개 = 사용자 한 명 기준, 분당 요청 수)
+READS_PER_MINUTE = 60
+WRITES_PER_MINUTE = 60
+
+# 호출 우선순위 (작을수록 먼저)
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_context = threading.local()
+
+
+# 현재 스레드의 호출 우선순위
+def current_priority():
+    return getattr(_context, "priority", INTERACTIVE)
+
+
+# 블록 안의 시트 호출을 주어진 우선순위로 실행
+@contextmanager
+def priority(level):
+    previous = current_priority()
+    _context.priority = level
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+# 잠시 후 다시 시도하면 되는 오류인지 확인 (429 / 5xx / 네트워크 오류)
+def is_retryable(error):
+    if isinstance(error, gspread.exceptions.APIError):
+        return error.code == 429 or 500 <= error.code < 600
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+# 나중에 다시 보내면 될 수 있는 오류인지 확인 (저장 요청을 실패로 버리기 전에 사용)
+# 429 / 5xx / 네트워크 오류에 더해 인증 토큰 갱신 / 전송 오류도 포함
+def is_transient(error):
+    if is_retryable(error):
+        return True
+    return isinstance(error, (google.auth.exceptions.TransportError, google.auth.exceptions.RefreshError,
+                              requests.exceptions.RequestException))
+
+
+# 지수 백오프 대기 시간 (attempts: 지금까지 실패한 횟수)
+def backoff_delay(attempts, base=1.0, cap=60.0):
+    delay = min(cap, base * (2 ** max(attempts - 1, 0)))
+    # 여러 프로세스가 동시에 재시도하지 않도록 약간 흔들어 줌
+    return delay * random.uniform(0.5, 1.0)
+
+
+# 429 응답의 Retry-After 헤더 (초), 없으면 None
+def retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+# 초당 rate개씩 채워지는 토큰 통
+class TokenBucket:
+    def __init__(self, capacity, rate, clock):
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # 토큰 하나를 쓰려면 기다려야 하는 시간
+    def wait_time(self, now):
+        self._refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+# 모든 Sheets API 호출이 거쳐 가는 할당량 스케줄러
+# - 읽기/쓰기 토큰 통으로 분당 할당량을 넘지 않게 조절
+# - 토큰을 기다리는 호출은 우선순위(화면 > 백그라운드), 도착 순서대로 처리
+# - 429를 받으면 Retry-After(없으면 흔들린 지수 백오프)만큼 모든 호출을 멈췄다가 재시도
+# clock / sleep / wait(condition, timeout)는 테스트에서 가짜 시계로 바꿔 넣을 때 사용
+class QuotaScheduler:
+    def __init__(self, reads_per_minute=READS_PER_MINUTE, writes_per_minute=WRITES_PER_MINUTE,
+                 max_retries=5, clock=time.monotonic, sleep=time.sleep, wait=None):
+        self.max_retries = max_retries
+        self.clock = clock
+        self.sleep = sleep
+        self.wait = wait or (lambda condition, timeout: condition.wait(timeout))
+        self._cond = threading.Condition()
+        self._buckets = {
+            "read": TokenBucket(reads_per_minute, reads_per_minute / 60, clock),
+            "write": TokenBucket(writes_per_minute, writes_per_minute / 60, clock),
+        }
+        self._waiting = {kind: [] for kind in self._buckets}
+        self._tickets = itertools.count()
+        self._paused_until = 0
+        self.stats = {
+            "calls": 0,
+            "throttled": 0,
+            "throttle_wait": 0.0,
+            "max_queue_depth": 0,
+            "rate_limited": 0,
+            "retries": 0,
+        }
+
+    # 지금 토큰을 기다리는 호출 수
+    def queue_depth(self, kind=None):
+        with self._cond:
+            if kind is not None:
+                return len(self._waiting[kind])
+            return sum(len(waiting) for waiting in self._waiting.values())
+
+    # 지표 모음
+    def metrics(self):
+        with self._cond:
+            metrics = dict(self.stats)
+            for kind, waiting in self._waiting.items():
+                metrics[f"queue_depth_{kind}"] = len(waiting)
+            metrics["avg_throttle_wait"] = (
+                self.stats["throttle_wait"] / self.stats["throttled"] if self.stats["throttled"] else 0.0
+            )
+            return metrics
+
+    # 토큰 하나 받기 (차례가 올 때까지 기다림)
+    def _acquire(self, kind, level):
+        bucket = self._buckets[kind]
+        waiting = self._waiting[kind]
+        ticket = (level, next(self._tickets))
+        with self._cond:
+            heapq.heappush(waiting, ticket)
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queue_depth())
+            throttled = False
+            waited = 0.0
+            while True:
+                now = self.clock()
+                wait = max(self._paused_until - now, 0)
+                if wait == 0 and waiting[0] == ticket:
+                    wait = bucket.wait_time(now)
+                    if wait == 0:
+                        bucket.take()
+                        heapq.heappop(waiting)
+                        self._cond.notify_all()
+                        break
+                # 맨 앞이 아니면 앞 호출이 토큰을 받을 때까지 기다림
+                # 실제로 기다린 호출과 기다린 시간만 기록
+                before = self.clock()
+                self.wait(self._cond, wait if wait > 0 else None)
+                waited += self.clock() - before
+                throttled = True
+            if throttled:
+                self.stats["throttled"] += 1
+                self.stats["throttle_wait"] += waited
+
+    # 할당량 안에서 func 실행 (kind: "read" / "write")
+    def call(self, kind, func, level=None):
+        level = current_priority() if level is None else level
+        attempts = 0
+        while True:
+            self._acquire(kind, level)
+            try:
+                result = func()
+            except Exception as e:
+                attempts += 1
+                if not is_retryable(e) or attempts > self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                delay = backoff_delay(attempts)
+                if isinstance(e, gspread.exceptions.APIError) and e.code == 429:
+                    # 할당량은 모든 호출이 같이 쓰므로 전체를 멈춤
+                    self.stats["rate_limited"] += 1
+                    delay = retry_after(e) or delay
+                    with self._cond:
+                        self._paused_until = max(self._paused_until, self.clock() + delay)
+                        self._cond.notify_all()
+                else:
+                    self.sleep(delay)
+                continue
+            with self._cond:
+                self.stats["calls"] += 1
+            # 화면 실행 중인 호출이면 호출 수를 기록 (받은 크기는 연결 풀의 응답 훅에서 기록)
+            tracing.count("api_calls")
+            return result
@@ -0,0 +1,49 @@
+from storage import to_bool
+
+# 진도 항목 표시 이름 (왼쪽 열 / 오른쪽 열)
+LEFT_FIELDS = [
+    ("vocabulary", "단어"),
+    ("listening", "듣기"),
+    ("grammar_review", "관리 문법"),
+    ("class_grammar", "수업 문법"),
+]
+RIGHT_FIELDS = [
+    ("reading", "독해"),
+    ("additional", "추가 학습"),
+    ("feedback", "일일 피드백"),
+    ("homework", "숙제"),
+]
+
+
+# 현재 커서가 가리키는 페이지의 (시작, 끝) 위치
+# 커서는 페이지 크기 단위로 맞추고 범위를 벗어나면 마지막 페이지로 옮김
+def page_bounds(cursor, total, page_size):
+    if total == 0:
+        return 0, 0
+    cursor = min(max(cursor, 0), total - 1) // page_size * page_size
+    return cursor, min(cursor + page_size, total)
+
+
+# 항목 목록을 하나의 마크다운 블록으로
+def fields_markdown(record, fields):
+    return "\n\n".join(f"**{label}**\n\n{record.get(col, '')}" for col, label in fields)
+
+
+# 완료 여부 문구
+def completed_markdown(record):
+    return f"**완료 여부**: {'완료' if to_bool(record.get('completed', False)) else '미완료'}"
+
+
+# 인쇄용 진도 기록 전체를 하나의 마크다운 문자열로 미리 만듦
+def print_view_markdown(student_name, start_date, end_date, records):
+    parts = [
+        "## 인쇄용 진도 기록",
+        f"### {student_name} 학생",
+        f"기간: {start_date} ~ {end_date}",
+    ]
+    for record in records:
+        parts.append(f"#### {record['date']} 진도 기록")
+        parts.append(fields_markdown(record, LEFT_FIELDS + RIGHT_FIELDS))
+        parts.append(completed_markdown(record))
+        parts.append("---")
+    return "\n\n".join(parts)
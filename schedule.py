@@ -0,0 +1,34 @@
+# 요일 (월요일부터)
+DAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+
+# 반 종류 문자열에 들어 있는 수업 요일 ("월수금" → ["월", "수", "금"])
+def class_days(class_type):
+    return [day for day in DAYS if day in str(class_type)]
+
+
+# 반 종류 정렬 기준 (첫 수업 요일 순, 같으면 이름 순)
+def class_type_order(class_type):
+    days = class_days(class_type)
+    return ([DAYS.index(day) for day in days] or [len(DAYS)], str(class_type))
+
+
+# 학생 명단에서 한 번 만들어 두는 수업 일정 색인
+# - 요일 → 그날 수업하는 학생 (등원 시간 순)
+# - 반 종류 → 학생 (등원 시간 순)
+# 반 종류 문자열에 요일 글자가 들어 있으면 그 요일 수업으로 봄 ("월수금", "화목", "토일" 등)
+class ScheduleIndex:
+    def __init__(self, students_df):
+        frame = students_df.sort_values("time", kind="stable").reset_index(drop=True)
+        class_types = frame["class_type"].astype(str)
+
+        # 요일마다 문자열 포함 여부를 한 번에 계산
+        self.by_day = {day: frame[class_types.str.contains(day, regex=False)] for day in DAYS}
+        self.student_ids = {day: students["student_id"].tolist() for day, students in self.by_day.items()}
+
+        groups = frame.groupby("class_type", sort=False)
+        self.by_class_type = dict(sorted(groups, key=lambda item: class_type_order(item[0])))
+
+    # 해당 요일에 수업하는 학생 (등원 시간 순)
+    def students_on(self, day):
+        return self.by_day[day]
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import threading
+import time
+
+import gspread
+from gspread.utils import rowcol_to_a1
+
+from id_allocator import ID_BLOCK_COLUMNS, ID_SHEET, max_student_id
+from progress_store import trim_header
+from sheets import sheet_header
+from storage import PROGRESS_COLUMNS, STUDENT_COLUMNS
+
+logger = logging.getLogger("progress_app.schema")
+
+# 앱이 쓰는 시트와 헤더
+SHEET_COLUMNS = {
+    "students": STUDENT_COLUMNS,
+    "progress": PROGRESS_COLUMNS,
+    ID_SHEET: ID_BLOCK_COLUMNS,
+}
+
+
+# 헤더가 달라진 것을 보고 다시 확인하는 최소 간격 (초)
+REVERIFY_INTERVAL = 60.0
+
+
+# 헤더 행의 해시 (뒤쪽 빈 칸을 빼고 열 이름과 순서가 같으면 같은 값)
+def header_hash(header):
+    return hashlib.sha1("\x1f".join(str(col) for col in trim_header(header)).encode("utf-8")).hexdigest()[:16]
+
+
+# 스프레드시트 구성(시트와 헤더) 확인
+# - 프로세스마다 한 번 백그라운드 스레드에서 확인하고, 없는 시트는 만듦
+# - 확인한 시트마다 헤더 해시를 기억해 두고, 읽기에서 받은 헤더와 비교만 함
+# - 헤더가 달라졌으면 그때만 백그라운드에서 다시 확인 (reverify_interval에 한 번까지)
+# 확인이 끝날 때까지 시트에 접근하는 쪽은 wait()으로 기다림 (화면의 첫 그리기는 기다리지 않음)
+class SchemaGuard:
+    def __init__(self, pool, today=None, reverify_interval=REVERIFY_INTERVAL, clock=time.monotonic):
+        self.pool = pool
+        self.today = today or (lambda: "")
+        self.reverify_interval = reverify_interval
+        self.clock = clock
+        self._reverified_at = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._verifying = False
+        self._listeners = []
+        self.hashes = {}
+        self.created = []
+        self.problems = {}
+        self.error = None
+        self.stats = {
+            "verifications": 0,
+            "mismatches": 0,
+            "reverify_skipped": 0,
+            "sheets_created": 0,
+            "last_verified": None,
+            "verify_seconds": 0.0,
+        }
+
+    # 시트 구성이 바뀌었을 때 (시트 생성, 헤더 변경) 부를 함수 등록
+    def add_listener(self, func):
+        with self._lock:
+            self._listeners.append(func)
+
+    # 확인이 끝났는지 (실패해도 끝난 것으로 봄)
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    # 확인이 끝날 때까지 기다림, 끝났으면 True
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    # 백그라운드에서 확인 시작 (이미 확인 중이면 아무것도 하지 않음)
+    # 앞 확인이 끝나고 등록된 함수를 부르는 중이면 새로 시작함
+    def start(self):
+        with self._lock:
+            if self._verifying:
+                return self
+            self._verifying = True
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name="schema-verify", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        changed = False
+        try:
+            changed = self.verify()
+            self.error = None
+        except Exception as e:
+            logger.exception("시트 구성을 확인하지 못했습니다.")
+            self.error = str(e)
+        finally:
+            self.stats["verifications"] += 1
+            self.stats["verify_seconds"] = time.perf_counter() - start
+            # 기다리는 쪽을 먼저 풀어 준 뒤 캐시 비우기 (캐시를 채우는 중인 읽기와 엇갈리지 않도록)
+            with self._lock:
+                self._verifying = False
+                self._ready.set()
+        if changed:
+            with self._lock:
+                listeners = list(self._listeners)
+            for func in listeners:
+                func()
+
+    # 시트 구성 확인 및 없는 시트 생성, 구성이 바뀌었으면 True
+    def verify(self):
+        pool = self.pool
+        try:
+            spreadsheet = pool.spreadsheet()
+        except gspread.exceptions.SpreadsheetNotFound:
+            spreadsheet = pool.create_spreadsheet()
+            self.created.append(pool.spreadsheet_name)
+        worksheets = pool.call(spreadsheet.worksheets)
+        worksheet_names = [ws.title for ws in worksheets]
+        # 목록에서 받은 핸들을 등록해 두어 시트마다 다시 열지 않음 (기억해 둔 헤더는 버림)
+        for worksheet in worksheets:
+            pool.forget_worksheet(worksheet.title)
+            pool.remember_worksheet(worksheet)
+
+        changed = False
+        for name, columns in SHEET_COLUMNS.items():
+            if name not in worksheet_names:
+                self._create(spreadsheet, name, columns)
+                header = columns
+            else:
+                # 헤더는 연결 풀에 기억해 두어 이후 쓰기에서 다시 읽지 않음
+                header, _ = sheet_header(pool, name)
+            missing = [col for col in columns if col not in header]
+            if missing:
+                self.problems[name] = f"'{name}' 시트에 {', '.join(missing)} 열이 없습니다."
+                logger.warning(self.problems[name])
+            else:
+                self.problems.pop(name, None)
+            digest = header_hash(header)
+            if self.hashes.get(name) != digest:
+                changed = changed or name in self.hashes or name not in worksheet_names
+                self.hashes[name] = digest
+        self.stats["last_verified"] = time.time()
+        return changed
+
+    # 시트 생성 후 헤더 쓰기
+    def _create(self, spreadsheet, name, columns):
+        pool = self.pool
+        worksheet = pool.call(lambda: spreadsheet.add_worksheet(title=name, rows=100, cols=max(len(columns), 3)),
+                              kind="write")
+        rows = [columns]
+        if name == ID_SHEET:
+            # 기존 학생 ID 다음 번호부터 발급하도록 첫 기록으로 남김 (처음 한 번만 명단을 읽음)
+            last_id = max_student_id(pool.run("students", lambda sheet: sheet.col_values(1))[1:])
+            rows.append([last_id, "existing", self.today()])
+        pool.call(lambda: worksheet.update(rows, f"A1:{rowcol_to_a1(len(rows), len(columns))}"), kind="write")
+        pool.remember_worksheet(worksheet)
+        pool.remember_header(name, columns)
+        self.created.append(name)
+        self.stats["sheets_created"] += 1
+
+    # 읽기에서 받은 헤더가 확인해 둔 것과 같은지 비교, 같으면 True
+    # 다르면 연결 풀에 기억해 둔 헤더를 버리고 백그라운드에서 다시 확인 (그동안 시트 접근은 기다림)
+    # 계속 다르게 보이더라도 reverify_interval 안에는 다시 확인하지 않음
+    def check(self, sheet_name, header):
+        expected = self.hashes.get(sheet_name)
+        if expected is None or not self.ready:
+            return True
+        if header_hash(header) == expected:
+            return True
+        self.stats["mismatches"] += 1
+        # 바뀐 헤더로 쓰도록 기억해 둔 헤더는 바로 버림
+        self.pool.forget_header(sheet_name)
+        with self._lock:
+            now = self.clock()
+            recent = self._reverified_at is not None and now - self._reverified_at < self.reverify_interval
+            if not recent:
+                self._reverified_at = now
+        if recent:
+            self.stats["reverify_skipped"] += 1
+            return False
+        logger.warning("'%s' 시트의 헤더가 바뀌었습니다. 시트 구성을 다시 확인합니다.", sheet_name)
+        self.start()
+        return False
+
+    # 지표 내보내기용
+    def metrics(self):
+        return {**self.stats, "ready": int(self.ready), "failed": int(self.error is not None)}
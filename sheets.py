@@ -0,0 +1,269 @@
+import threading
+from datetime import datetime, timedelta
+
+import gspread
+from gspread.utils import a1_range_to_grid_range, rowcol_to_a1
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+
+import tracing
+from quota import QuotaScheduler
+
+# Google API 권한 범위
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+# 토큰 만료 전 미리 갱신할 여유 시간
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+# 인증 오류인지 확인하는 함수
+def is_auth_error(error):
+    if isinstance(error, RefreshError):
+        return True
+    if isinstance(error, gspread.exceptions.APIError):
+        return error.code == 401
+    return False
+
+
+# 프로세스 전체에서 공유하는 Google Sheets 연결 풀
+# - 인증된 client 하나를 유지하고 Spreadsheet / Worksheet 핸들을 캐시
+# - 토큰 만료 전에 미리 갱신하고, 인증 오류가 나면 다시 연결
+# - 모든 API 호출은 할당량 스케줄러를 거침
+class SheetsPool:
+    def __init__(self, service_account_info, spreadsheet_name, scopes=SCOPES, client_factory=None,
+                 scheduler=None):
+        self.service_account_info = service_account_info
+        self.spreadsheet_name = spreadsheet_name
+        self.scopes = scopes
+        # 테스트용 가짜 client 등을 주입할 때 사용
+        self.client_factory = client_factory
+        self.scheduler = scheduler or QuotaScheduler()
+
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._client = None
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._headers = {}
+        self._received = threading.local()
+
+        self.stats = {
+            "connections_made": 0,
+            "connections_reused": 0,
+            "spreadsheets_opened": 0,
+            "spreadsheets_reused": 0,
+            "worksheets_opened": 0,
+            "worksheets_reused": 0,
+            "token_refreshes": 0,
+            "reconnects": 0,
+        }
+
+    # 새 client 인증 (응답 크기를 세도록 HTTP 세션에 응답 훅을 닮)
+    @tracing.traced("sheets:authorize")
+    def _authorize(self):
+        if self.client_factory is not None:
+            self._credentials = None
+            self._client = self.client_factory()
+        else:
+            self._credentials = Credentials.from_service_account_info(
+                self.service_account_info, scopes=self.scopes
+            )
+            self._client = gspread.authorize(self._credentials)
+        session = getattr(getattr(self._client, "http_client", None), "session", None)
+        if session is not None and self._on_response not in session.hooks["response"]:
+            session.hooks["response"].append(self._on_response)
+        self.stats["connections_made"] += 1
+
+    # 받은 응답의 본문 크기 기록 (requests 응답 훅, 호출한 스레드에서 실행됨)
+    # 받은 본문 길이만 보므로 응답을 다시 직렬화하지 않음
+    def _on_response(self, response, *args, **kwargs):
+        size = len(response.content or b"")
+        self._received.bytes = self.bytes_received() + size
+        tracing.count("bytes", size)
+
+    # 이 스레드가 지금까지 받은 응답 크기 합 (바이트)
+    def bytes_received(self):
+        return getattr(self._received, "bytes", 0)
+
+    # 만료가 가까운 토큰을 미리 갱신
+    def _refresh_token_if_needed(self):
+        credentials = self._credentials
+        if credentials is None:
+            return
+        # google-auth의 expiry는 UTC 기준 naive datetime
+        expiry = credentials.expiry
+        if credentials.valid and expiry is not None and expiry - datetime.utcnow() > TOKEN_REFRESH_MARGIN:
+            return
+        credentials.refresh(Request())
+        self.stats["token_refreshes"] += 1
+
+    # 인증된 client 반환 (없으면 새로 연결)
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._authorize()
+            else:
+                self._refresh_token_if_needed()
+                self.stats["connections_reused"] += 1
+            return self._client
+
+    # 스프레드시트 핸들 반환 (이름 검색은 한 번만)
+    def spreadsheet(self, name=None):
+        name = name or self.spreadsheet_name
+        with self._lock:
+            client = self.client()
+            spreadsheet = self._spreadsheets.get(name)
+            if spreadsheet is None:
+                with tracing.span("sheets:open"):
+                    spreadsheet = self.scheduler.call("read", lambda: client.open(name))
+                self._spreadsheets[name] = spreadsheet
+                self.stats["spreadsheets_opened"] += 1
+            else:
+                self.stats["spreadsheets_reused"] += 1
+            return spreadsheet
+
+    # 스프레드시트 새로 생성 후 캐시에 등록
+    def create_spreadsheet(self, name=None):
+        name = name or self.spreadsheet_name
+        with self._lock:
+            client = self.client()
+            spreadsheet = self.scheduler.call("write", lambda: client.create(name))
+            self._spreadsheets[name] = spreadsheet
+            return spreadsheet
+
+    # 워크시트 핸들 반환
+    def worksheet(self, sheet_name, spreadsheet_name=None):
+        key = (spreadsheet_name or self.spreadsheet_name, sheet_name)
+        with self._lock:
+            worksheet = self._worksheets.get(key)
+            if worksheet is None:
+                spreadsheet = self.spreadsheet(key[0])
+                worksheet = self.scheduler.call("read", lambda: spreadsheet.worksheet(sheet_name))
+                self._worksheets[key] = worksheet
+                self.stats["worksheets_opened"] += 1
+            else:
+                self._refresh_token_if_needed()
+                self.stats["worksheets_reused"] += 1
+            return worksheet
+
+    # 새로 만든 워크시트를 캐시에 등록
+    def remember_worksheet(self, worksheet, spreadsheet_name=None):
+        with self._lock:
+            self._worksheets[(spreadsheet_name or self.spreadsheet_name, worksheet.title)] = worksheet
+
+    # 워크시트 핸들로 작업 실행 (kind: 할당량 종류 "read" / "write")
+    # 인증 오류가 나면 한 번 다시 연결해서 재시도
+    def run(self, sheet_name, func, kind="read"):
+        try:
+            worksheet = self.worksheet(sheet_name)
+            return self.scheduler.call(kind, lambda: func(worksheet))
+        except gspread.exceptions.WorksheetNotFound:
+            self.forget_worksheet(sheet_name)
+            raise
+        except Exception as e:
+            if not is_auth_error(e):
+                raise
+            self.reset()
+            self.stats["reconnects"] += 1
+            worksheet = self.worksheet(sheet_name)
+            return self.scheduler.call(kind, lambda: func(worksheet))
+
+    # 워크시트와 관계없는 API 호출 실행 (시트 목록 조회, 시트 생성 등)
+    def call(self, func, kind="read"):
+        return self.scheduler.call(kind, func)
+
+    # 캐시된 헤더 행 (없으면 None)
+    def cached_header(self, sheet_name):
+        with self._lock:
+            return self._headers.get(sheet_name)
+
+    # 헤더 행 캐시에 저장
+    def remember_header(self, sheet_name, header):
+        with self._lock:
+            self._headers[sheet_name] = list(header)
+
+    # 캐시된 헤더 행 제거 (다음 쓰기에서 다시 읽음)
+    def forget_header(self, sheet_name):
+        with self._lock:
+            self._headers.pop(sheet_name, None)
+
+    # 캐시된 워크시트 핸들 제거
+    def forget_worksheet(self, sheet_name, spreadsheet_name=None):
+        with self._lock:
+            self._worksheets.pop((spreadsheet_name or self.spreadsheet_name, sheet_name), None)
+            self._headers.pop(sheet_name, None)
+
+    # 연결과 캐시된 핸들 모두 초기화
+    def reset(self):
+        with self._lock:
+            self._credentials = None
+            self._client = None
+            self._spreadsheets.clear()
+            self._worksheets.clear()
+            self._headers.clear()
+
+
+# append 응답의 updatedRange("progress!A57:K57")에서 행 번호 추출
+def appended_row_number(response):
+    updated_range = response["updates"]["updatedRange"]
+    grid = a1_range_to_grid_range(updated_range.split("!")[-1])
+    return grid["startRowIndex"] + 1
+
+
+# 값이 주어진 열들을 연속된 구간으로 묶어 batch_update 데이터 생성
+def row_ranges(header, row_number, values):
+    positions = sorted(header.index(col) for col in values if col in header)
+    data = []
+    start = prev = None
+    for pos in positions + [None]:
+        if start is not None and (pos is None or pos != prev + 1):
+            data.append({
+                "range": f"{rowcol_to_a1(row_number, start + 1)}:{rowcol_to_a1(row_number, prev + 1)}",
+                "values": [[values[header[i]] for i in range(start, prev + 1)]],
+            })
+            start = None
+        if pos is not None and start is None:
+            start = pos
+        prev = pos
+    return data
+
+
+# 시트의 헤더 행 (캐시에 없을 때만 시트에서 받음)
+# (헤더, 사용한 API 호출 수)를 반환
+def sheet_header(pool, sheet_name):
+    header = pool.cached_header(sheet_name)
+    if header is not None:
+        return header, 0
+    header = pool.run(sheet_name, lambda sheet: sheet.row_values(1))
+    pool.remember_header(sheet_name, header)
+    return header, 1
+
+
+# 여러 행을 한꺼번에 갱신하거나 추가
+# updates: [(행 번호, 값)] → 주어진 열만 한 번의 batch_update로 갱신
+# appends: [값] → 한 번의 append_rows로 추가
+# (추가된 첫 행 번호, 사용한 API 호출 수)를 반환
+def upsert_rows(pool, sheet_name, updates=(), appends=()):
+    header, calls = sheet_header(pool, sheet_name)
+
+    columns = {col for _, values in updates for col in values} | {col for values in appends for col in values}
+    unknown = sorted(columns - set(header))
+    if unknown:
+        raise KeyError(f"'{sheet_name}' 시트에 없는 열입니다: {', '.join(unknown)}")
+
+    first_row = None
+    if updates:
+        data = [item for row_number, values in updates for item in row_ranges(header, row_number, values)]
+        pool.run(sheet_name, lambda sheet: sheet.batch_update(data), kind="write")
+        calls += 1
+    if appends:
+        rows = [[values.get(col, "") for col in header] for values in appends]
+        response = pool.run(sheet_name, lambda sheet: sheet.append_rows(rows, table_range="A1"), kind="write")
+        first_row = appended_row_number(response)
+        calls += 1
+    return first_row, calls
+
@@ -0,0 +1,860 @@
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+import tracing
+from cache import ReadCache, as_record
+from id_allocator import SheetIdAllocator, format_student_id, normalize_student_id
+from progress_store import ProgressIndex, ProgressSync, parse_date, progress_key, record_key
+from quota import BACKGROUND, backoff_delay, is_retryable, priority
+from sheets import upsert_rows
+from write_queue import WriteQueue
+
+# 시트별 열 구성
+STUDENT_COLUMNS = ['student_id', 'name', 'class_type', 'time', 'class_duration', 'active']
+PROGRESS_COLUMNS = ['student_id', 'date', 'vocabulary', 'listening',
+                    'grammar_review', 'class_grammar', 'reading',
+                    'additional', 'feedback', 'homework', 'completed']
+
+# 원격 레코드를 로컬에 한 번에 반영하는 행 수 (잠금을 잡고 있는 단위)
+MERGE_CHUNK = 500
+
+# 진도 입력 항목 (키 열 제외)
+PROGRESS_FIELDS = PROGRESS_COLUMNS[2:]
+
+
+# 시트의 "TRUE"/"FALSE" 문자열 등을 bool로 변환
+def to_bool(value):
+    if isinstance(value, str):
+        return value.strip().upper() in ("TRUE", "1", "Y", "YES")
+    return bool(value)
+
+
+# 진도 표의 글자 열을 범주형으로 바꾸는 기준 (서로 다른 값 수 / 행 수)
+CATEGORY_RATIO = 0.5
+
+
+# 진도 레코드(또는 DataFrame) → 열 형식이 정해진 진도 표
+# - student_id: 범주형, 명단과 같은 "001" 형식 (시트에서 1로 읽힌 값도 같은 값으로)
+# - date: datetime64 (알 수 없는 형식은 NaT)
+# - completed: bool
+# - 값이 많이 반복되는 글자 열은 범주형 (같은 문자열을 한 번만 저장), 나머지는 문자열
+# 저장소가 한 사본을 모든 세션에 나눠 주므로 받은 쪽에서 고치지 않음
+# (거르거나 정렬한 결과는 copy-on-write로 따로 복사됨)
+def progress_frame(records):
+    frame = pd.DataFrame(records, columns=PROGRESS_COLUMNS, dtype=object)
+    ids = {value: normalize_student_id(value) for value in frame['student_id'].unique()}
+    frame['student_id'] = frame['student_id'].map(ids).astype("category")
+
+    dates = pd.to_datetime(frame['date'].astype(str), format="%Y-%m-%d", errors="coerce")
+    # 시트에 직접 입력한 다른 형식만 하나씩 변환
+    other = dates.isna() & frame['date'].notna()
+    if other.any():
+        dates[other] = pd.to_datetime(frame.loc[other, 'date'].map(parse_date), errors="coerce")
+    frame['date'] = dates
+
+    frame['completed'] = frame['completed'].map(to_bool).astype(bool)
+    for col in PROGRESS_FIELDS:
+        if col == "completed":
+            continue
+        values = frame[col].fillna("").astype(str)
+        frame[col] = values.astype("category") if values.nunique() <= len(values) * CATEGORY_RATIO else values
+    return frame
+
+
+# 학생 레코드 → 학생 명단 표 (student_id는 진도 표와 같은 "001" 형식)
+# 시트에서 읽은 ID는 "001" → 1처럼 숫자로 바뀌어 있으므로 되돌림
+def students_frame(records):
+    frame = pd.DataFrame(records)
+    if 'student_id' in frame:
+        frame['student_id'] = frame['student_id'].map(normalize_student_id)
+    return frame
+
+
+# 진도 레코드 하나의 값 형식 맞추기 (저장소마다 같은 형식으로 돌려주도록)
+# - student_id: "001" 형식, date와 입력 항목: 문자열, completed: bool (시트의 "FALSE"는 False)
+def progress_record(record):
+    typed = {col: "" if record.get(col) is None else str(record.get(col)) for col in PROGRESS_COLUMNS}
+    typed['student_id'] = normalize_student_id(typed['student_id'])
+    typed['completed'] = to_bool(record.get('completed', False))
+    return typed
+
+
+# 진도 레코드 목록 → 값 형식을 맞춘 DataFrame (조회/내보내기용, 날짜는 문자열 그대로)
+def progress_rows(records):
+    return pd.DataFrame([progress_record(record) for record in records], columns=PROGRESS_COLUMNS)
+
+
+# 시트별 표 만들기 (없는 시트는 레코드 그대로 DataFrame으로)
+FRAME_BUILDERS = {"students": students_frame, "progress": progress_frame}
+
+
+# Google Sheets 저장소
+# read / write 는 읽기 캐시, 진도 색인, 증분 동기화를 거쳐 시트에 접근
+class SheetsStorage:
+    def __init__(self, pool, ttl=60, schema=None):
+        self.pool = pool
+        # 시트 구성 확인 (SchemaGuard), 확인이 끝날 때까지 시트 접근을 미룸
+        self.schema = schema
+        self.cache = ReadCache(ttl=ttl)
+        self.index = ProgressIndex()
+        self.sync = ProgressSync(self.index)
+        self.ids = SheetIdAllocator(pool)
+
+    # 시트 구성 확인이 끝날 때까지 기다림
+    def _wait_schema(self):
+        if self.schema is not None:
+            self.schema.wait()
+
+    # 시트 전체 레코드 받아오기
+    # 받은 헤더는 확인해 둔 시트 구성과 비교 (다르면 구성을 다시 확인)
+    def fetch_records(self, sheet_name, full=False):
+        self._wait_schema()
+        if sheet_name == "progress":
+            # 새로 생긴 행과 바뀐 행만 받아옴
+            records = self.sync.refresh(self.pool, full=full)
+            header = self.sync.header
+        else:
+            records = self.pool.run(sheet_name, lambda sheet: sheet.get_all_records())
+            header = list(records[0]) if records else None
+        if self.schema is not None and header:
+            self.schema.check(sheet_name, header)
+        return records
+
+    # 레코드 목록 (fresh=True면 캐시를 건너뛰고 다시 받음)
+    def records(self, sheet_name, fresh=False, full=False):
+        if fresh:
+            return self.cache.store(sheet_name, self.fetch_records(sheet_name, full=full))
+        return self.cache.records(sheet_name, lambda: self.fetch_records(sheet_name))
+
+    # 받아오기(pull)용: 시트를 최신으로 맞추고 지난번 이후 바뀐 레코드만 반환
+    # 진도가 아닌 시트이거나 그 사이 전체를 다시 받았으면 전체 레코드
+    def changed_records(self, sheet_name, full=False):
+        records = self.records(sheet_name, fresh=True, full=full)
+        if sheet_name != "progress":
+            return records
+        changes = self.sync.take_changes()
+        return records if changes is None else changes
+
+    # 데이터 읽기 (캐시가 유효하면 API 호출 없이 반환, 진도는 형식이 정해진 표로)
+    def read(self, sheet_name):
+        build = FRAME_BUILDERS.get(sheet_name, pd.DataFrame)
+        return self.cache.frame(sheet_name, lambda: self.fetch_records(sheet_name), build=build)
+
+    # 시트 데이터가 바뀔 때마다 올라가는 버전
+    def version(self, sheet_name):
+        return self.cache.version(sheet_name)
+
+    # 학생 한 명의 특정 날짜 진도 (없으면 None)
+    def get_progress(self, student_id, date):
+        self.records("progress")
+        record = self.index.get(student_id, date)
+        return None if record is None else progress_record(record)
+
+    # 학생 한 명의 기간 내 진도 (최근 날짜부터)
+    # 학생별 날짜 색인으로 해당 행만 골라 그 행들만 시트에서 다시 받음
+    def query_progress(self, student_id, start_date, end_date):
+        self.records("progress")
+        rows = self.index.rows_between(student_id, start_date, end_date)
+        if not self.sync.fetch_rows(self.pool, rows):
+            # 시트 행 위치가 바뀜 → 전체를 다시 맞춘 뒤 로컬 사본에서 조회
+            self.records("progress", fresh=True)
+            rows = self.index.rows_between(student_id, start_date, end_date)
+        return progress_rows(self.index.record_at(row) for row in reversed(rows))
+
+    # 기간 내 진도를 chunk_size개씩 DataFrame으로 (학생 순, 학생마다 날짜 순)
+    # 내보내기 전에 한 번 증분 동기화로 최신 상태를 맞춤
+    def iter_progress(self, start_date, end_date, student_ids=None, chunk_size=500):
+        self.records("progress", fresh=True)
+        rows = self.index.rows_in_range(start_date, end_date, student_ids)
+        for start in range(0, len(rows), chunk_size):
+            yield progress_rows(self.index.record_at(row) for row in rows[start:start + chunk_size])
+
+    # 데이터 쓰기, 사용한 API 호출 수를 반환
+    def write(self, sheet_name, data, student_id=None, date=None):
+        if sheet_name == "progress":
+            return self.write_many([(student_id, date, data)])
+        # 다른 시트는 다음 읽기에서 다시 불러오도록 무효화
+        self.cache.invalidate(sheet_name)
+        return 0
+
+    # 여러 진도를 한꺼번에 저장, 사용한 API 호출 수를 반환
+    # entries: [(student_id, date, data)]
+    # 기존 행은 한 번의 batch_update로, 새 행은 한 번의 append_rows로 씀
+    def write_many(self, entries):
+        self._wait_schema()
+        calls = 0
+
+        # 색인이 없을 때만 전체 레코드를 읽어 만듦
+        if not self.index.built:
+            self.records("progress", fresh=True)
+            calls += 1
+
+        # 같은 학생/날짜는 하나로 합침
+        merged = {}
+        for student_id, date, data in entries:
+            key = progress_key(student_id, date)
+            if key in merged:
+                merged[key][2].update(data)
+            else:
+                merged[key] = (student_id, date, dict(data))
+
+        updates = []
+        appends = []
+        for student_id, date, data in merged.values():
+            # 특정 학생의 특정 날짜 데이터 찾기
+            row_idx = self.index.row_number(student_id, date)
+            if row_idx:
+                updates.append((row_idx, data))
+            else:
+                # 새 레코드 추가
+                values = {col: '' for col in PROGRESS_COLUMNS}
+                values.update(data)
+                values.update({'student_id': student_id, 'date': date,
+                               'completed': data.get('completed', False)})
+                appends.append(values)
+        if not updates and not appends:
+            return calls
+
+        first_row, used = upsert_rows(self.pool, "progress", updates, appends)
+        calls += used
+
+        # 색인과 캐시된 레코드도 같이 고침
+        changed = {}
+        for row_idx, data in updates:
+            values = as_record(list(data), list(data.values()))
+            self.index.update(row_idx, values)
+            # 시트에 저장된 형태로 다음 동기화 때 다시 받아옴
+            self.sync.mark_dirty(row_idx)
+            changed[record_key(self.index.record_at(row_idx))] = values
+        if changed:
+            def apply(records):
+                for idx, record in enumerate(records):
+                    values = changed.get(record_key(record))
+                    if values is not None:
+                        records[idx] = {**record, **values}
+            self.cache.patch("progress", apply)
+
+        added = [as_record(PROGRESS_COLUMNS, [values[col] for col in PROGRESS_COLUMNS]) for values in appends]
+        if all(self.index.append(first_row + offset, record) for offset, record in enumerate(added)):
+            self.cache.patch("progress", lambda records: records.extend(added))
+        else:
+            # 다른 곳에서 행이 추가됨 → 다음 읽기에서 다시 불러옴
+            self.cache.invalidate("progress")
+        return calls
+
+    # 학생 레코드 여러 줄을 한 번의 append_rows로 추가
+    def append_students(self, records):
+        rows = [[record.get(col, '') for col in STUDENT_COLUMNS] for record in records]
+        if not rows:
+            return
+        self._wait_schema()
+        self.pool.run("students", lambda sheet: sheet.append_rows(rows), kind="write")
+        self.cache.patch("students", lambda cached: cached.extend(as_record(STUDENT_COLUMNS, row) for row in rows))
+
+    # 학생 레코드 한 줄 추가
+    def append_student(self, record):
+        self.append_students([record])
+
+    # 새 학생 ID count개 예약 (발급 기록 시트 사용, 학생 명단은 읽지 않음)
+    def reserve_ids(self, count):
+        self._wait_schema()
+        return [format_student_id(number) for number in self.ids.reserve(count)]
+
+    # 새 학생 여러 명 추가, 새 학생 ID 목록을 반환
+    # students: [{'name', 'class_type', 'time', 'class_duration'}]
+    def add_students(self, students):
+        # 새 학생 ID를 한 묶음으로 예약
+        new_ids = self.reserve_ids(len(students))
+        records = [
+            {**student, 'student_id': student_id, 'active': True}
+            for student_id, student in zip(new_ids, students)
+        ]
+        self.append_students(records)
+        return new_ids
+
+    # 새 학생 추가, 새 학생 ID를 반환
+    def add_student(self, name, class_type, start_time, duration):
+        return self.add_students([{
+            'name': name,
+            'class_type': class_type,
+            'time': start_time,
+            'class_duration': duration,
+        }])[0]
+
+    # 시트 반영 상태 (바로 쓰므로 기록이 있으면 항상 "confirmed")
+    def save_status(self, student_id, date):
+        return "confirmed" if self.get_progress(student_id, date) else None
+
+    # 캐시와 색인 모두 비우기
+    def invalidate(self):
+        self.cache.invalidate()
+        self.sync.invalidate()
+        self.ids.invalidate()
+
+
+# 로컬 SQLite 저장소
+# - 화면은 로컬 DB만 읽고 씀
+# - 바뀐 행은 pending 카운터를 올려 두고, SyncWorker가 원격(Sheets)으로 밀어냄
+# - 원격에서 받아온 값은 아직 밀어내지 않은(pending) 행을 덮어쓰지 않음
+# - 새 학생 ID는 원격에서 미리 예약해 둔 ID(id_pool)에서 꺼내 씀
+class SQLiteStorage:
+    SCHEMA = f"""
+        CREATE TABLE IF NOT EXISTS students (
+            student_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL DEFAULT '',
+            class_type TEXT NOT NULL DEFAULT '',
+            time TEXT NOT NULL DEFAULT '',
+            class_duration INTEGER,
+            active INTEGER NOT NULL DEFAULT 1,
+            pending INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS progress (
+            student_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            {", ".join(f"{col} TEXT NOT NULL DEFAULT ''" for col in PROGRESS_FIELDS[:-1])},
+            completed INTEGER NOT NULL DEFAULT 0,
+            pending INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, date)
+        );
+        CREATE TABLE IF NOT EXISTS id_pool (
+            student_id TEXT PRIMARY KEY
+        );
+        CREATE INDEX IF NOT EXISTS progress_date ON progress (date);
+        CREATE INDEX IF NOT EXISTS students_pending ON students (pending) WHERE pending > 0;
+        CREATE INDEX IF NOT EXISTS progress_pending ON progress (pending) WHERE pending > 0;
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._normalize_ids()
+        self._versions = {"students": 0, "progress": 0}
+        self._frames = {}
+
+    # 예전 버전이 시트에서 받아 "1"처럼 저장한 학생 ID를 "001" 형식으로 고침
+    # 같은 학생이 두 형식으로 모두 있으면 (받아오면서 생긴 중복) 잘못된 형식의 행을 지움
+    def _normalize_ids(self):
+        with self._lock, self._conn:
+            for table in ("students", "progress", "id_pool"):
+                for (old,) in self._conn.execute(f"SELECT DISTINCT student_id FROM {table}").fetchall():
+                    new = normalize_student_id(old)
+                    if new == old:
+                        continue
+                    self._conn.execute(f"UPDATE OR IGNORE {table} SET student_id = ? WHERE student_id = ?",
+                                       (new, old))
+                    self._conn.execute(f"DELETE FROM {table} WHERE student_id = ?", (old,))
+
+    def _bump(self, sheet_name):
+        self._versions[sheet_name] += 1
+        self._frames.pop(sheet_name, None)
+
+    # 테이블 데이터가 바뀔 때마다 올라가는 버전
+    def version(self, sheet_name):
+        return self._versions[sheet_name]
+
+    # 비어 있는 테이블인지 확인
+    def is_empty(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM students) + (SELECT COUNT(*) FROM progress)"
+            ).fetchone()
+            return row[0] == 0
+
+    # 데이터 읽기 (같은 버전이면 만들어 둔 DataFrame 재사용)
+    def read(self, sheet_name):
+        columns = STUDENT_COLUMNS if sheet_name == "students" else PROGRESS_COLUMNS
+        with self._lock:
+            frame = self._frames.get(sheet_name)
+            tracing.count("cache_misses" if frame is None else "cache_hits")
+            if frame is None:
+                frame = pd.read_sql_query(
+                    f"SELECT {', '.join(columns)} FROM {sheet_name} ORDER BY rowid", self._conn
+                )
+                if sheet_name == "progress":
+                    frame = progress_frame(frame)
+                else:
+                    frame['active'] = frame['active'].astype(bool)
+                self._frames[sheet_name] = frame
+            return frame
+
+    # 학생 한 명의 특정 날짜 진도 (없으면 None)
+    def get_progress(self, student_id, date):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM progress WHERE student_id = ? AND date = ?",
+                (normalize_student_id(student_id), str(date)),
+            ).fetchone()
+        return None if row is None else progress_record(dict(row))
+
+    # 학생 한 명의 기간 내 진도 (최근 날짜부터, (student_id, date) 기본 키 색인 사용)
+    def query_progress(self, student_id, start_date, end_date):
+        with self._lock:
+            frame = pd.read_sql_query(
+                f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM progress "
+                "WHERE student_id = ? AND date BETWEEN ? AND ? ORDER BY date DESC",
+                self._conn,
+                params=[normalize_student_id(student_id), start_date.isoformat(), end_date.isoformat()],
+            )
+        frame["completed"] = frame["completed"].astype(bool)
+        return frame
+
+    # 기간 내 진도를 chunk_size개씩 DataFrame으로 (학생 순, 학생마다 날짜 순)
+    # 마지막으로 받은 (student_id, date) 다음부터 기본 키 색인으로 이어서 읽어 메모리를 일정하게 유지
+    def iter_progress(self, start_date, end_date, student_ids=None, chunk_size=500):
+        where = "date BETWEEN ? AND ?"
+        params = [start_date.isoformat(), end_date.isoformat()]
+        if student_ids is not None:
+            student_ids = [normalize_student_id(student_id) for student_id in student_ids]
+            if not student_ids:
+                return
+            where += f" AND student_id IN ({', '.join('?' for _ in student_ids)})"
+            params += student_ids
+        last = []
+        while True:
+            with self._lock:
+                frame = pd.read_sql_query(
+                    f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM progress "
+                    f"WHERE {where}{' AND (student_id, date) > (?, ?)' if last else ''} "
+                    "ORDER BY student_id, date LIMIT ?",
+                    self._conn,
+                    params=params + last + [chunk_size],
+                )
+            if frame.empty:
+                return
+            frame["completed"] = frame["completed"].astype(bool)
+            yield frame
+            if len(frame) < chunk_size:
+                return
+            last = [frame["student_id"].iloc[-1], frame["date"].iloc[-1]]
+
+    # 진도 행의 pending 값 (행이 없으면 None)
+    def pending_state(self, student_id, date):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pending FROM progress WHERE student_id = ? AND date = ?",
+                (normalize_student_id(student_id), str(date)),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    # 진도 저장 (로컬에 바로 쓰고 pending 표시), 사용한 API 호출 수(0)를 반환
+    def write(self, sheet_name, data, student_id=None, date=None):
+        if sheet_name != "progress":
+            return 0
+        return self.write_many([(student_id, date, data)])
+
+    # 여러 진도를 한 트랜잭션으로 저장, 사용한 API 호출 수(0)를 반환
+    # entries: [(student_id, date, data)]
+    def write_many(self, entries):
+        # 입력된 항목 구성이 같은 것끼리 묶어 executemany
+        groups = {}
+        for student_id, date, data in entries:
+            fields = tuple(col for col in PROGRESS_FIELDS if col in data)
+            values = [int(to_bool(data[col])) if col == "completed" else data[col] for col in fields]
+            groups.setdefault(fields, []).append([normalize_student_id(student_id), str(date), *values])
+        if not groups:
+            return 0
+        with self._lock, self._conn:
+            for fields, rows in groups.items():
+                updates = ", ".join(f"{col} = excluded.{col}" for col in fields)
+                self._conn.executemany(
+                    f"""
+                    INSERT INTO progress (student_id, date, {", ".join(list(fields) + ["pending"])})
+                    VALUES (?, ?, {", ".join("?" for _ in fields)}, 1)
+                    ON CONFLICT (student_id, date) DO UPDATE SET
+                        {updates + ", " if updates else ""}pending = progress.pending + 1
+                    """,
+                    rows,
+                )
+            self._bump("progress")
+        return 0
+
+    # 학생 레코드 여러 줄을 한 트랜잭션으로 추가
+    def append_students(self, records, pending=True):
+        rows = [
+            [normalize_student_id(record['student_id']), record.get('name', ''), record.get('class_type', ''),
+             record.get('time', ''), record.get('class_duration'), int(to_bool(record.get('active', True))),
+             int(pending)]
+            for record in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO students ({', '.join(STUDENT_COLUMNS)}, pending) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._bump("students")
+
+    # 학생 레코드 한 줄 추가
+    def append_student(self, record, pending=True):
+        self.append_students([record], pending)
+
+    # 예약해 두고 아직 쓰지 않은 학생 ID 수
+    def available_ids(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM id_pool").fetchone()[0]
+
+    # 예약한 학생 ID 추가
+    def add_ids(self, student_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO id_pool (student_id) VALUES (?)",
+                                   [[normalize_student_id(student_id)] for student_id in student_ids])
+
+    # 새 학생 여러 명 추가, 새 학생 ID 목록을 반환
+    # students: [{'name', 'class_type', 'time', 'class_duration'}]
+    # 예약해 둔 ID를 꺼내는 것과 학생 추가는 한 트랜잭션
+    def add_students(self, students):
+        with self._lock, self._conn:
+            new_ids = [row[0] for row in self._conn.execute(
+                "SELECT student_id FROM id_pool ORDER BY rowid LIMIT ?", [len(students)]
+            )]
+            if len(new_ids) < len(students):
+                raise LookupError("예약해 둔 학생 ID가 부족합니다.")
+            self._conn.executemany("DELETE FROM id_pool WHERE student_id = ?", [[new_id] for new_id in new_ids])
+            self.append_students([
+                {**student, 'student_id': student_id, 'active': True}
+                for student_id, student in zip(new_ids, students)
+            ])
+        return new_ids
+
+    # 새 학생 추가, 새 학생 ID를 반환
+    def add_student(self, name, class_type, start_time, duration):
+        return self.add_students([{
+            'name': name,
+            'class_type': class_type,
+            'time': start_time,
+            'class_duration': duration,
+        }])[0]
+
+    # 원격으로 밀어낼 행 목록 [(pending 값, 레코드)]
+    def pending(self, sheet_name):
+        columns = STUDENT_COLUMNS if sheet_name == "students" else PROGRESS_COLUMNS
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT pending, {', '.join(columns)} FROM {sheet_name} WHERE pending > 0 ORDER BY rowid"
+            ).fetchall()
+        result = []
+        for row in rows:
+            record = dict(row)
+            pending = record.pop("pending")
+            for col in ("active", "completed"):
+                if col in record:
+                    record[col] = bool(record[col])
+            result.append((pending, record))
+        return result
+
+    # 밀어내기 완료 표시 (그 사이 다시 바뀐 행은 그대로 둠)
+    def mark_pushed(self, sheet_name, record, pending):
+        if sheet_name == "students":
+            where, key = "student_id = ?", [normalize_student_id(record["student_id"])]
+        else:
+            where, key = "student_id = ? AND date = ?", [normalize_student_id(record["student_id"]), str(record["date"])]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE {sheet_name} SET pending = 0 WHERE {where} AND pending = ?", key + [pending]
+            )
+
+    # 원격 레코드를 로컬에 반영, 바뀐 행 수를 반환
+    # MERGE_CHUNK행씩 나눠 쓰고 그 사이에 잠금을 풀어 화면의 읽기가 오래 기다리지 않게 함
+    def merge_remote(self, sheet_name, records):
+        if sheet_name == "students":
+            columns, keys = STUDENT_COLUMNS, ["student_id"]
+        else:
+            columns, keys = PROGRESS_COLUMNS, ["student_id", "date"]
+        rows = []
+        for record in records:
+            row = []
+            for col in columns:
+                value = record.get(col, '')
+                if col in ("active", "completed"):
+                    value = int(to_bool(value))
+                elif col == "date":
+                    # 기간 조회가 문자열 비교로 되도록 ISO 형식으로 저장
+                    day = parse_date(value)
+                    value = day.isoformat() if day else str(value)
+                elif col == "student_id":
+                    # 시트에서는 "001"이 1로 읽히므로 로컬에서 만든 행과 같은 형식으로
+                    value = normalize_student_id(value)
+                row.append(value)
+            rows.append(row)
+
+        others = [col for col in columns if col not in keys]
+        changed = " OR ".join(f"{sheet_name}.{col} IS NOT excluded.{col}" for col in others)
+        upsert = f"""
+            INSERT INTO {sheet_name} ({", ".join(columns)})
+            VALUES ({", ".join("?" for _ in columns)})
+            ON CONFLICT ({", ".join(keys)}) DO UPDATE SET
+                {", ".join(f"{col} = excluded.{col}" for col in others)}
+            WHERE {sheet_name}.pending = 0 AND ({changed})
+        """
+        count = 0
+        for start in range(0, len(rows), MERGE_CHUNK):
+            with self._lock, self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(upsert, rows[start:start + MERGE_CHUNK])
+                changes = self._conn.total_changes - before
+                if changes:
+                    self._bump(sheet_name)
+            count += changes
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# 로컬 저장소와 원격 저장소를 맞추는 백그라운드 작업자
+# - pending 행을 원격으로 밀어내고
+# - pull_interval마다 원격에서 새로 생긴 내용을 받아오고
+# - full_pull_interval마다 시트에서 직접 고친 행까지 전체를 받아옴
+class SyncWorker:
+    def __init__(self, local, remote, interval=2.0, pull_interval=30.0, full_pull_interval=600.0,
+                 batch_size=100):
+        self.local = local
+        self.remote = remote
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pull_interval = pull_interval
+        self.full_pull_interval = full_pull_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_pull = None
+        self._last_full_pull = None
+        self._failures = 0
+        self.stats = {
+            "pushed": 0,
+            "pulled": 0,
+            "errors": 0,
+            "last_error": None,
+            "last_sync": None,
+        }
+
+    # 로컬 변경 밀어내기, 밀어낸 행 수를 반환
+    # batch_size개씩 묶어 시트마다 한 번의 호출로 씀
+    def push(self):
+        pushed = 0
+        students = self.local.pending("students")
+        for start in range(0, len(students), self.batch_size):
+            batch = students[start:start + self.batch_size]
+            self.remote.append_students([record for _, record in batch])
+            for pending, record in batch:
+                self.local.mark_pushed("students", record, pending)
+            pushed += len(batch)
+        progress = self.local.pending("progress")
+        for start in range(0, len(progress), self.batch_size):
+            batch = progress[start:start + self.batch_size]
+            self.remote.write_many([
+                (record["student_id"], record["date"], {col: record[col] for col in PROGRESS_FIELDS})
+                for _, record in batch
+            ])
+            for pending, record in batch:
+                self.local.mark_pushed("progress", record, pending)
+            pushed += len(batch)
+        self.stats["pushed"] += pushed
+        return pushed
+
+    # 원격 변경 받아오기, 로컬에서 바뀐 행 수를 반환
+    def pull(self):
+        pulled = 0
+        now = time.monotonic()
+        full = self._last_full_pull is None or now - self._last_full_pull >= self.full_pull_interval
+        for sheet_name in ("students", "progress"):
+            # 진도 시트는 보통 증분 동기화로 새 행/바뀐 행만 받아 그 행만 반영
+            records = self.remote.changed_records(sheet_name, full=full)
+            pulled += self.local.merge_remote(sheet_name, records)
+        self._last_pull = now
+        if full:
+            self._last_full_pull = now
+        self.stats["pulled"] += pulled
+        return pulled
+
+    # 연속 실패로 백오프 중인지 여부
+    @property
+    def backing_off(self):
+        return self._failures > 0
+
+    # 밀어내기와 (필요하면) 받아오기 한 번 실행, 다음 실행까지 기다릴 시간을 반환
+    def run_once(self):
+        try:
+            self.push()
+            if self._last_pull is None or time.monotonic() - self._last_pull >= self.pull_interval:
+                self.pull()
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.stats["last_error"] = str(e)
+            # 429 / 5xx는 점점 길게 기다리고, 그 밖의 오류도 시트를 두드리지 않도록 최대 대기
+            self._failures += 1
+            if is_retryable(e):
+                return max(self.interval, backoff_delay(self._failures))
+            return backoff_delay(self._failures, base=60.0, cap=60.0)
+        self._failures = 0
+        self.stats["last_sync"] = time.time()
+        return self.interval
+
+    def _loop(self):
+        # 화면에서 하는 호출보다 뒤에 처리
+        with priority(BACKGROUND):
+            while not self._stop.is_set():
+                wait = self.run_once()
+                self._wake.wait(wait)
+                self._wake.clear()
+
+    # 로컬 변경 직후 바로 밀어내도록 깨움
+    def kick(self):
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="sheets-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# 로컬 저장소 + 백그라운드 동기화를 하나로 묶은 저장소
+# 화면에서는 SheetsStorage와 같은 방식으로 사용
+# 새 학생 ID는 원격에서 id_block_size개씩 예약해 로컬에 두고 씀
+class SyncedStorage:
+    def __init__(self, local, remote, id_block_size=20, **worker_options):
+        self.local = local
+        self.remote = remote
+        self.id_block_size = id_block_size
+        self.worker = SyncWorker(local, remote, **worker_options)
+
+    # 로컬에 예약해 둔 ID가 모자라면 원격에서 한 묶음 더 예약
+    def _ensure_ids(self, count):
+        missing = count - self.local.available_ids()
+        if missing > 0:
+            self.local.add_ids(self.remote.reserve_ids(max(missing, self.id_block_size)))
+
+    # 로컬이 비어 있으면 한 번 동기로 받아온 뒤 백그라운드 작업 시작
+    def start(self):
+        if self.local.is_empty():
+            self.worker.run_once()
+        self.worker.start()
+        return self
+
+    def read(self, sheet_name):
+        return self.local.read(sheet_name)
+
+    def version(self, sheet_name):
+        return self.local.version(sheet_name)
+
+    def get_progress(self, student_id, date):
+        return self.local.get_progress(student_id, date)
+
+    def query_progress(self, student_id, start_date, end_date):
+        return self.local.query_progress(student_id, start_date, end_date)
+
+    def iter_progress(self, start_date, end_date, student_ids=None, chunk_size=500):
+        return self.local.iter_progress(start_date, end_date, student_ids, chunk_size)
+
+    def write(self, sheet_name, data, student_id=None, date=None):
+        calls = self.local.write(sheet_name, data, student_id=student_id, date=date)
+        self.worker.kick()
+        return calls
+
+    def write_many(self, entries):
+        calls = self.local.write_many(entries)
+        self.worker.kick()
+        return calls
+
+    def add_student(self, name, class_type, start_time, duration):
+        self._ensure_ids(1)
+        new_id = self.local.add_student(name, class_type, start_time, duration)
+        self.worker.kick()
+        return new_id
+
+    def add_students(self, students):
+        self._ensure_ids(len(students))
+        new_ids = self.local.add_students(students)
+        self.worker.kick()
+        return new_ids
+
+    # 시트 반영 상태: "pending" / "retrying" / "confirmed" / None
+    def save_status(self, student_id, date):
+        pending = self.local.pending_state(student_id, date)
+        if pending is None:
+            return None
+        if pending == 0:
+            return "confirmed"
+        return "retrying" if self.worker.backing_off else "pending"
+
+    def invalidate(self):
+        self.remote.invalidate()
+
+
+# 시트 저장소 앞에 write-behind 큐를 둔 저장소
+# 진도 저장은 큐에 넣고 바로 돌아오며, 큐가 백그라운드에서 여러 건씩 묶어 시트에 씀
+class WriteBehindStorage:
+    def __init__(self, storage, queue_path, **queue_options):
+        self.storage = storage
+        self.queue = WriteQueue(queue_path, self._flush, **queue_options)
+
+    # 큐에서 꺼낸 요청 묶음을 시트에 씀
+    def _flush(self, entries):
+        self.storage.write_many(entries)
+
+    def start(self):
+        self.queue.start()
+        return self
+
+    def read(self, sheet_name):
+        return self.storage.read(sheet_name)
+
+    def version(self, sheet_name):
+        return self.storage.version(sheet_name)
+
+    # 아직 시트에 반영되지 않은 값을 덮어서 반환
+    def get_progress(self, student_id, date):
+        record = self.storage.get_progress(student_id, date)
+        pending = self.queue.pending_data(student_id, date)
+        if not pending:
+            return record
+        base = record or {col: '' for col in PROGRESS_COLUMNS}
+        return progress_record({**base, **pending, 'student_id': student_id, 'date': date})
+
+    def query_progress(self, student_id, start_date, end_date):
+        return self.storage.query_progress(student_id, start_date, end_date)
+
+    def iter_progress(self, start_date, end_date, student_ids=None, chunk_size=500):
+        return self.storage.iter_progress(start_date, end_date, student_ids, chunk_size)
+
+    def write(self, sheet_name, data, student_id=None, date=None):
+        if sheet_name != "progress":
+            return self.storage.write(sheet_name, data, student_id=student_id, date=date)
+        self.queue.enqueue(student_id, date, data)
+        return 0
+
+    def write_many(self, entries):
+        for student_id, date, data in entries:
+            self.queue.enqueue(student_id, date, data)
+        return 0
+
+    def add_student(self, name, class_type, start_time, duration):
+        return self.storage.add_student(name, class_type, start_time, duration)
+
+    def add_students(self, students):
+        return self.storage.add_students(students)
+
+    # 시트 반영 상태: "pending" / "retrying" / "confirmed" / "failed" / None
+    def save_status(self, student_id, date):
+        return self.queue.status(student_id, date)
+
+    # 시트 반영에 실패한 저장을 다시 보냄, 다시 넣은 요청 수를 반환
+    def retry_save(self, student_id, date):
+        return self.queue.retry_failed(student_id, date)
+
+    def invalidate(self):
+        self.storage.invalidate()
@@ -1,110 +1,122 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 from datetime import datetime, timedelta
 import pytz
 
+from bulk import (CELL_LIMIT, decode_upload, progress_changes, progress_grid, read_table,
+                  validate_students)
+from export import SPLITS, available_formats, export_progress, remove_export
+from fake_sheets import FakeClient
+from render import (LEFT_FIELDS, RIGHT_FIELDS, completed_markdown,
+                    fields_markdown, page_bounds, print_view_markdown)
+from schedule import DAYS, ScheduleIndex, class_type_order
+from schema import SchemaGuard
+from sheets import SheetsPool
+from storage import (PROGRESS_COLUMNS, SheetsStorage,
+                     SQLiteStorage, SyncedStorage, WriteBehindStorage)
+from tracing import TRACE_LOG, current_trace, span, start_metrics_server, traced
+
 # 페이지 설정
 st.set_page_config(page_title="학생 진도 관리", layout="wide")
 
 # 스프레드시트 이름 지정
 SPREADSHEET_NAME = "학생진도관리"
 
-# Google Sheets 연결 함수
-def connect():
-    credentials = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"],
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ],
-    )
-    client = gspread.authorize(credentials)
-    return client
-
-# 시트 초기화 함수
-def init_sheets():
-    client = connect()
-    
+# 설정값 읽기 (secrets.toml이 없으면 기본값)
+def get_setting(key, default):
     try:
-        # 스프레드시트 생성 또는 열기
-        try:
-            # 이미 존재하는 스프레드시트 열기
-            spreadsheet = client.open(SPREADSHEET_NAME)
-            st.success(f"'{SPREADSHEET_NAME}' 스프레드시트에 연결했습니다.")
-        except gspread.exceptions.SpreadsheetNotFound:
-            # 존재하지 않으면 새로 생성
-            spreadsheet = client.create(SPREADSHEET_NAME)
-            st.success(f"'{SPREADSHEET_NAME}' 스프레드시트를 생성했습니다.")
-        
-        # 시트 목록 가져오기
-        worksheet_names = [ws.title for ws in spreadsheet.worksheets()]
-        
-        # students 시트 확인/생성
-        if "students" not in worksheet_names:
-            students_sheet = spreadsheet.add_worksheet(title="students", rows=100, cols=20)
-            # 헤더 추가
-            students_sheet.update('A1:F1', [['student_id', 'name', 'class_type', 'time', 'class_duration', 'active']])
-            st.success("'students' 시트가 생성되었습니다!")
-        
-        # progress 시트 확인/생성
-        if "progress" not in worksheet_names:
-            progress_sheet = spreadsheet.add_worksheet(title="progress", rows=100, cols=20)
-            # 헤더 추가
-            progress_sheet.update('A1:K1', [['student_id', 'date', 'vocabulary', 'listening', 
-                                           'grammar_review', 'class_grammar', 'reading', 
-                                           'additional', 'feedback', 'homework', 'completed']])
-            st.success("'progress' 시트가 생성되었습니다!")
-        
-        return True
-    except Exception as e:
-        st.error(f"시트 초기화 중 오류가 발생했습니다: {e}")
-        return False
+        return st.secrets.get(key, default)
+    except FileNotFoundError:
+        return default
+
+# 읽기 캐시 유지 시간 (초)
+CACHE_TTL = 60
+
+# 저장소 종류: "sqlite"(로컬 DB + 백그라운드 동기화) 또는 "sheets"(시트 직접 사용)
+STORAGE_BACKEND = get_setting("storage_backend", "sqlite")
+SQLITE_PATH = get_setting("sqlite_path", "progress.db")
+
+# "sheets" 저장소에서 진도 저장을 잠시 담아 두는 write-behind 큐 파일
+WRITE_QUEUE_PATH = get_setting("write_queue_path", "write_queue.db")
+
+# 한 페이지에 표시할 진도 기록 / 학생 수
+HISTORY_PAGE_SIZE = 10
+STUDENT_PAGE_SIZE = 20
+
+# 시트 반영 상태 표시 문구
+SAVE_STATUS_LABELS = {
+    "pending": "시트 반영 대기 중",
+    "retrying": "시트 반영 재시도 대기 중",
+    "confirmed": "시트에 반영됨",
+    "failed": "시트 반영 실패",
+}
+
+# 오프라인 모드: Google Sheets 대신 메모리 안의 가짜 시트 사용
+OFFLINE = get_setting("offline", False)
+
+# 사이드바에 성능 기록 패널 표시 여부
+ADMIN_PANEL = get_setting("admin_panel", False)
+
+# Prometheus 지표를 내보낼 포트 (없으면 서버를 띄우지 않음)
+METRICS_PORT = get_setting("metrics_port", None)
+
+# 프로세스 전체에서 공유하는 연결 풀
+@st.cache_resource
+def get_pool():
+    if OFFLINE:
+        client = FakeClient()
+        return SheetsPool(None, SPREADSHEET_NAME, client_factory=lambda: client)
+    return SheetsPool(st.secrets["gcp_service_account"], SPREADSHEET_NAME)
+
+# 시트 구성 확인 (프로세스마다 한 번, 백그라운드에서 실행)
+@st.cache_resource
+def get_schema():
+    return SchemaGuard(get_pool(), today=get_kr_today).start()
+
+# Google Sheets 저장소 (읽기 캐시 / 진도 색인 / 증분 동기화 포함)
+# 시트 구성이 바뀌면 (시트 생성, 헤더 변경) 캐시와 색인을 비움
+@st.cache_resource
+def get_sheets_storage():
+    schema = get_schema()
+    storage = SheetsStorage(get_pool(), ttl=CACHE_TTL, schema=schema)
+    schema.add_listener(storage.invalidate)
+    return storage
+
+# 화면에서 사용하는 저장소
+@st.cache_resource
+def get_storage():
+    if STORAGE_BACKEND == "sheets":
+        return WriteBehindStorage(get_sheets_storage(), WRITE_QUEUE_PATH).start()
+    return SyncedStorage(SQLiteStorage(SQLITE_PATH), get_sheets_storage()).start()
+
+# 내보낼 지표 등록 (프로세스마다 한 번), 지표 서버를 띄웠으면 서버를 반환
+@st.cache_resource
+def register_metrics():
+    sheets_storage = get_sheets_storage()
+    TRACE_LOG.add_collector("sheets_quota", get_pool().scheduler.metrics)
+    TRACE_LOG.add_collector("sheets_pool", lambda: dict(get_pool().stats))
+    TRACE_LOG.add_collector("schema", get_schema().metrics)
+    TRACE_LOG.add_collector("read_cache", lambda: dict(sheets_storage.cache.stats))
+    TRACE_LOG.add_collector("progress_sync", lambda: dict(sheets_storage.sync.stats))
+    storage = get_storage()
+    if isinstance(storage, WriteBehindStorage):
+        TRACE_LOG.add_collector("write_queue", lambda: {**storage.queue.stats, "depth": storage.queue.depth()})
+    else:
+        TRACE_LOG.add_collector("sync_worker", lambda: dict(storage.worker.stats))
+    if METRICS_PORT:
+        return start_metrics_server(int(METRICS_PORT))
+    return None
 
 # 데이터 읽기 함수
+@traced("read")
 def read(sheet_name):
-    client = connect()
-    # 이름으로 스프레드시트 열기
-    sheet = client.open(SPREADSHEET_NAME).worksheet(sheet_name)
-    data = sheet.get_all_records()
-    return pd.DataFrame(data)
+    return get_storage().read(sheet_name)
 
 # 데이터 쓰기 함수
+# 사용한 API 호출 수를 반환
+@traced("write")
 def write(sheet_name, data, student_id=None, date=None):
-    client = connect()
-    sheet = client.open(SPREADSHEET_NAME).worksheet(sheet_name)
-    
-    if sheet_name == "progress":
-        # 특정 학생의 특정 날짜 데이터 업데이트
-        records = sheet.get_all_records()
-        row_idx = None
-        
-        for idx, record in enumerate(records):
-            if record['student_id'] == student_id and record['date'] == date:
-                row_idx = idx + 2  # +2: 헤더 행과 0-인덱스 보정
-                break
-        
-        if row_idx:
-            # 기존 레코드 업데이트
-            for col, value in data.items():
-                col_idx = sheet.find(col).col
-                sheet.update_cell(row_idx, col_idx, value)
-        else:
-            # 새 레코드 추가
-            sheet.append_row([
-                student_id, 
-                date, 
-                data.get('vocabulary', ''), 
-                data.get('listening', ''), 
-                data.get('grammar_review', ''), 
-                data.get('class_grammar', ''), 
-                data.get('reading', ''), 
-                data.get('additional', ''), 
-                data.get('feedback', ''), 
-                data.get('homework', ''), 
-                data.get('completed', False)
-            ])
+    return get_storage().write(sheet_name, data, student_id=student_id, date=date)
 
 # 현재 날짜 (한국 시간)
 def get_kr_today():
@@ -114,161 +126,152 @@ def get_kr_today():
 # 오늘 요일 (한국 시간)
 def get_kr_day():
     kr_tz = pytz.timezone('Asia/Seoul')
-    days = ["월", "화", "수", "목", "금", "토", "일"]
-    return days[datetime.now(kr_tz).weekday()]
+    return DAYS[datetime.now(kr_tz).weekday()]
 
-# 학생의 수업일인지 확인하는 함수
-def is_class_day(class_type, day):
-    if class_type == "월수금" and day in ["월", "수", "금"]:
-        return True
-    elif class_type == "화목토" and day in ["화", "목", "토"]:
-        return True
-    return False
+# 학생 명단 버전마다 한 번만 만드는 수업 일정 색인
+@st.cache_resource(max_entries=2)
+def get_schedule(version, _students_df):
+    return ScheduleIndex(_students_df)
 
-# 메인 앱
-def main():
-    st.title("학생 진도 관리 시스템")
-    
-    # 첫 실행 시 시트 초기화
-    if 'sheets_initialized' not in st.session_state:
-        if init_sheets():
-            st.session_state.sheets_initialized = True
-    
-    # 탭 설정
-    tab1, tab2, tab3 = st.tabs(["오늘의 수업", "전체 학생 관리", "진도 기록 조회"])
+# 커서를 한 페이지 앞/뒤로 옮김 (버튼 on_click, 화면을 그리기 전에 실행됨)
+def move_cursor(key, step):
+    st.session_state[key] = st.session_state.get(key, 0) + step
+
+# 이전/다음 버튼을 그리고 현재 페이지의 (시작, 끝) 위치를 반환
+# 커서(현재 페이지 첫 위치)는 세션에 저장, 버튼을 누르면 on_click에서 먼저 옮긴 뒤 범위와 버튼 상태를 계산
+def page_controls(key, total, page_size):
+    start, end = page_bounds(st.session_state.get(key, 0), total, page_size)
+    st.session_state[key] = start
+    if total > page_size:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        col_prev.button("이전", key=f"{key}_prev", disabled=start == 0,
+                        on_click=move_cursor, args=(key, -page_size))
+        col_next.button("다음", key=f"{key}_next", disabled=end >= total,
+                        on_click=move_cursor, args=(key, page_size))
+        col_info.caption(f"{start + 1}-{end} / 전체 {total}개")
+    return start, end
+
+# 세션 안에서 입력(key)이 같으면 다시 계산하지 않고 저장해 둔 값을 반환
+def session_memo(name, key, func):
+    memo = st.session_state.setdefault("memo", {})
+    entry = memo.get(name)
+    if entry is None or entry[0] != key:
+        entry = (key, func())
+        memo[name] = entry
+    return entry[1]
+
+# 저장해 둔 값 버리기 (저장 직후처럼 버전만으로 알 수 없을 때)
+def forget_memo(*names):
+    memo = st.session_state.get("memo", {})
+    for name in names:
+        memo.pop(name, None)
+
+# 학생 명단 (명단 버전이 같으면 세션에 저장해 둔 것을 사용)
+def session_roster():
+    storage = get_storage()
+    return session_memo("students", storage.version("students"), lambda: read("students"))
+
+# 오늘의 수업 (반 전체 진도 입력 표를 고쳐도 이 부분만 다시 실행)
+@st.fragment
+@traced("tab:today")
+def today_class_view():
+    today_day = get_kr_day()
+    st.header(f"오늘의 수업 ({get_kr_today()}, {today_day}요일)")
     
-    with tab1:
-        st.header(f"오늘의 수업 ({get_kr_today()}, {get_kr_day()}요일)")
+    # 학생 데이터 불러오기
+    try:
+        students_df = session_roster()
         
-        # 학생 데이터 불러오기
-        try:
-            students_df = read("students")
+        # 데이터가 비어있지 않은지 확인
+        if not students_df.empty:
+            # 오늘 요일에 해당하는 학생 (일정 색인에서 바로 꺼냄)
+            schedule = get_schedule(get_storage().version("students"), students_df)
+            today_students = schedule.students_on(today_day)
             
-            # 데이터가 비어있지 않은지 확인
-            if not students_df.empty:
-                # 오늘 요일에 해당하는 학생만 필터링
-                today_day = get_kr_day()
-                today_students = students_df[students_df.apply(lambda x: is_class_day(x["class_type"], today_day), axis=1)]
-                
-                if len(today_students) == 0:
-                    st.info(f"오늘({today_day}요일) 수업이 예정된 학생이 없습니다.")
-                else:
-                    # 학생 목록을 그리드로 표시
-                    cols = st.columns(3)
-                    for idx, student in today_students.iterrows():
-                        col_idx = idx % 3
-                        with cols[col_idx]:
-                            st.write(f"**{student['name']}**")
-                            st.write(f"반: {student['class_type']} / 시간: {student['time']}")
-                            if st.button(f"진도 관리", key=f"manage_{student['student_id']}"):
-                                st.session_state.selected_student = student['student_id']
-                                st.session_state.selected_student_name = student['name']
-                                st.session_state.selected_date = get_kr_today()
-                                st.session_state.view = "student_detail"
-                                st.rerun()
-            else:
-                st.info("등록된 학생이 없습니다. '전체 학생 관리' 탭에서 학생을 추가해 주세요.")
-        
-        except Exception as e:
-            st.error(f"데이터를 불러오는 중 오류가 발생했습니다: {e}")
-            st.info("시트 구조를 확인해 주세요. 'students' 시트에는 'student_id', 'name', 'class_type', 'time', 'class_duration', 'active' 열이 있어야 합니다.")
-    
-    with tab2:
-        st.header("전체 학생 관리")
-        
-        # 새 학생 추가 폼
-        with st.expander("새 학생 추가"):
-            with st.form("new_student"):
-                new_name = st.text_input("학생 이름")
-                new_class_type = st.selectbox("반 선택", ["월수금", "화목토"])
-                new_time = st.time_input("등원 시간")
-                new_duration = st.number_input("수업 시간 (분)", min_value=30, max_value=180, step=30)
-                
-                if st.form_submit_button("학생 추가"):
-                    try:
-                        # 스프레드시트에 연결
-                        client = connect()
-                        sheet = client.open(SPREADSHEET_NAME).worksheet("students")
-                        
-                        # 기존 학생 데이터 가져오기
-                        existing_data = sheet.get_all_records()
-                        
-                        # 새 학생 ID 생성
-                        new_id = f"{len(existing_data) + 1:03d}"
-                        
-                        # Google Sheets에 추가
-                        sheet.append_row([
-                            new_id, 
-                            new_name, 
-                            new_class_type, 
-                            new_time.strftime("%H:%M"), 
-                            new_duration,
-                            True
-                        ])
-                        st.success(f"{new_name} 학생이 추가되었습니다!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"학생 추가 중 오류가 발생했습니다: {e}")
-        
-        # 학생 목록 표시
-        try:
-            students_df = read("students")
-            if students_df.empty:
-                st.info("등록된 학생이 없습니다.")
+            if len(today_students) == 0:
+                st.info(f"오늘({today_day}요일) 수업이 예정된 학생이 없습니다.")
             else:
-                st.subheader("학생 목록")
-                # 반별로 정렬
-                students_df = students_df.sort_values(by=['class_type', 'time'])
-                
-                # 월수금반과 화목토반 구분
-                st.write("### 월수금반")
-                msf_students = students_df[students_df['class_type'] == '월수금']
-                for idx, student in msf_students.iterrows():
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.write(f"**{student['name']}** - {student['time']}")
-                    with col2:
-                        if st.button("진도 관리", key=f"progress_msf_{student['student_id']}"):
+                # 학생 목록을 그리드로 표시
+                cols = st.columns(3)
+                for idx, student in enumerate(today_students.to_dict("records")):
+                    col_idx = idx % 3
+                    with cols[col_idx]:
+                        st.write(f"**{student['name']}**")
+                        st.write(f"반: {student['class_type']} / 시간: {student['time']}")
+                        if st.button(f"진도 관리", key=f"manage_{student['student_id']}"):
                             st.session_state.selected_student = student['student_id']
                             st.session_state.selected_student_name = student['name']
                             st.session_state.selected_date = get_kr_today()
                             st.session_state.view = "student_detail"
                             st.rerun()
                 
-                st.write("### 화목토반")
-                tts_students = students_df[students_df['class_type'] == '화목토']
-                for idx, student in tts_students.iterrows():
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.write(f"**{student['name']}** - {student['time']}")
-                    with col2:
-                        if st.button("진도 관리", key=f"progress_tts_{student['student_id']}"):
-                            st.session_state.selected_student = student['student_id']
-                            st.session_state.selected_student_name = student['name']
-                            st.session_state.selected_date = get_kr_today()
-                            st.session_state.view = "student_detail"
-                            st.rerun()
-        
-        except Exception as e:
-            st.error(f"학생 목록을 불러오는 중 오류가 발생했습니다: {e}")
+                # 반 전체 진도 한 번에 입력 (바뀐 학생만 한 번에 저장)
+                with st.expander("반 전체 진도 한 번에 입력"):
+                    today = get_kr_today()
+                    grid_class = st.selectbox(
+                        "반 선택",
+                        sorted(today_students['class_type'].unique(), key=class_type_order),
+                        key="grid_class",
+                    )
+                    storage = get_storage()
+                    grid = session_memo(
+                        "progress_grid",
+                        (grid_class, today, storage.version("students"), storage.version("progress")),
+                        lambda: progress_grid(storage, today_students[today_students['class_type'] == grid_class],
+                                              today),
+                    )
+                    edited = st.data_editor(
+                        grid,
+                        key=f"progress_grid_{grid_class}_{today}",
+                        disabled=["name"],
+                        hide_index=True,
+                        column_config={
+                            "name": "이름",
+                            **{col: st.column_config.TextColumn(label) for col, label in LEFT_FIELDS + RIGHT_FIELDS},
+                            "completed": st.column_config.CheckboxColumn("완료"),
+                        },
+                    )
+                    common_homework = st.text_input("숙제가 비어 있는 학생에게 같은 숙제 입력", key="grid_homework")
+                    
+                    if st.button("한 번에 저장", key="grid_save"):
+                        if common_homework:
+                            edited.loc[edited['homework'].fillna('') == '', 'homework'] = common_homework
+                        entries, errors = progress_changes(grid, edited, today)
+                        if entries:
+                            get_storage().write_many(entries)
+                            forget_memo("progress_grid", "detail_record")
+                            st.success(f"{len(entries)}명의 진도 정보가 저장되었습니다! 시트에는 잠시 후 반영됩니다.")
+                        elif not errors:
+                            st.info("바뀐 내용이 없습니다.")
+                        for error in errors:
+                            st.warning(error)
+        else:
+            st.info("등록된 학생이 없습니다. '전체 학생 관리' 탭에서 학생을 추가해 주세요.")
     
-with tab3:
+    except Exception as e:
+        st.error(f"데이터를 불러오는 중 오류가 발생했습니다: {e}")
+        st.info("시트 구조를 확인해 주세요. 'students' 시트에는 'student_id', 'name', 'class_type', 'time', 'class_duration', 'active' 열이 있어야 합니다.")
+
+# 진도 기록 조회 (학생/기간 선택, 페이지 넘기기, 내보내기는 이 부분만 다시 실행)
+@st.fragment
+@traced("tab:history")
+def history_view():
     st.header("진도 기록 조회")
-    
+
     try:
         # 학생 목록 가져오기
-        students_df = read("students")
+        students_df = session_roster()
         if students_df.empty:
             st.info("등록된 학생이 없습니다.")
         else:
             # 학생 선택
             student_names = students_df['name'].tolist()
             selected_student_name = st.selectbox("학생 선택", student_names)
-            
+        
             # 선택된 학생의 ID 가져오기
             selected_student = students_df[students_df['name'] == selected_student_name].iloc[0]
             student_id = selected_student['student_id']
-            
+        
             # 날짜 범위 선택
             col1, col2 = st.columns(2)
             with col1:
@@ -277,210 +280,317 @@ with tab3:
             with col2:
                 end_date = st.date_input("종료일", 
                                         value=datetime.strptime(get_kr_today(), '%Y-%m-%d'))
-            
-            # 조회 버튼
+        
+            # 조회 버튼 (결과는 세션에 남겨 두고 페이지를 넘겨도 유지)
             if st.button("진도 기록 조회"):
-                # 진도 데이터 가져오기
-                progress_df = read("progress")
-                
-                # 선택된 학생의 지정된 날짜 범위 내 진도 기록 필터링
-                start_date_str = start_date.strftime('%Y-%m-%d')
-                end_date_str = end_date.strftime('%Y-%m-%d')
-                
-                student_progress = progress_df[
-                    (progress_df["student_id"] == student_id) & 
-                    (progress_df["date"] >= start_date_str) & 
-                    (progress_df["date"] <= end_date_str)
-                ]
+                # 선택된 학생의 지정된 날짜 범위 내 진도 기록만 가져오기 (최근 날짜부터)
+                records = get_storage().query_progress(student_id, start_date, end_date)
+                st.session_state.history = {
+                    'student_name': selected_student_name,
+                    'start': start_date.strftime('%Y-%m-%d'),
+                    'end': end_date.strftime('%Y-%m-%d'),
+                    'records': records,
+                    # CSV는 조회할 때 한 번만 만듦 (페이지를 넘길 때마다 다시 만들지 않도록)
+                    'csv': records.to_csv(index=False),
+                }
+                st.session_state.history_cursor = 0
+                st.session_state.pop("history_print", None)
+            
+            history = st.session_state.get("history")
+            if history is not None:
+                student_progress = history['records']
+                start_date_str, end_date_str = history['start'], history['end']
                 
                 if student_progress.empty:
-                    st.info(f"{selected_student_name} 학생의 선택된 기간 내 진도 기록이 없습니다.")
+                    st.info(f"{history['student_name']} 학생의 선택된 기간 내 진도 기록이 없습니다.")
                 else:
-                    # 날짜별로 정렬
-                    student_progress = student_progress.sort_values(by='date', ascending=False)
-                    
-                    # 진도 기록 표시
-                    for _, progress in student_progress.iterrows():
+                    # 진도 기록 표시 (한 페이지씩)
+                    start, end = page_controls("history_cursor", len(student_progress), HISTORY_PAGE_SIZE)
+                    for progress in student_progress.iloc[start:end].to_dict("records"):
                         with st.expander(f"{progress['date']} 진도 기록"):
                             col1, col2 = st.columns(2)
-                            with col1:
-                                st.write("**단어**")
-                                st.write(progress['vocabulary'])
-                                
-                                st.write("**듣기**")
-                                st.write(progress['listening'])
-                                
-                                st.write("**관리 문법**")
-                                st.write(progress['grammar_review'])
-                                
-                                st.write("**수업 문법**")
-                                st.write(progress['class_grammar'])
-                            
-                            with col2:
-                                st.write("**독해**")
-                                st.write(progress['reading'])
-                                
-                                st.write("**추가 학습**")
-                                st.write(progress['additional'])
-                                
-                                st.write("**일일 피드백**")
-                                st.write(progress['feedback'])
-                                
-                                st.write("**숙제**")
-                                st.write(progress['homework'])
-                            
-                            st.write(f"**완료 여부**: {'완료' if progress['completed'] else '미완료'}")
+                            col1.markdown(fields_markdown(progress, LEFT_FIELDS))
+                            col2.markdown(fields_markdown(progress, RIGHT_FIELDS))
+                            st.markdown(completed_markdown(progress))
                     
                     # 엑셀 다운로드 버튼 추가
-                    # CSV 형식으로 다운로드
-                    csv = student_progress.to_csv(index=False)
+                    # CSV 형식으로 다운로드 (조회할 때 만들어 둔 것)
                     st.download_button(
                         label="CSV 파일 다운로드",
-                        data=csv,
-                        file_name=f"{selected_student_name}_진도기록_{start_date_str}_{end_date_str}.csv",
+                        data=history['csv'],
+                        file_name=f"{history['student_name']}_진도기록_{start_date_str}_{end_date_str}.csv",
                         mime="text/csv",
                     )
                     
-                    # 진도 기록 인쇄용 버전
+                    # 진도 기록 인쇄용 버전 (한 번 만든 마크다운을 그대로 표시)
                     if st.button("인쇄용 버전 보기"):
-                        # 인쇄용 HTML 생성
-                        st.markdown("## 인쇄용 진도 기록")
-                        st.markdown(f"### {selected_student_name} 학생")
-                        st.markdown(f"기간: {start_date_str} ~ {end_date_str}")
-                        
-                        # 날짜별로 정렬된 진도 기록 표시
-                        for _, progress in student_progress.iterrows():
-                            st.markdown(f"#### {progress['date']} 진도 기록")
-                            st.markdown("**단어**")
-                            st.markdown(f"{progress['vocabulary']}")
-                            
-                            st.markdown("**듣기**")
-                            st.markdown(f"{progress['listening']}")
-                            
-                            st.markdown("**관리 문법**")
-                            st.markdown(f"{progress['grammar_review']}")
-                            
-                            st.markdown("**수업 문법**")
-                            st.markdown(f"{progress['class_grammar']}")
-                            
-                            st.markdown("**독해**")
-                            st.markdown(f"{progress['reading']}")
-                            
-                            st.markdown("**추가 학습**")
-                            st.markdown(f"{progress['additional']}")
-                            
-                            st.markdown("**일일 피드백**")
-                            st.markdown(f"{progress['feedback']}")
-                            
-                            st.markdown("**숙제**")
-                            st.markdown(f"{progress['homework']}")
-                            
-                            st.markdown(f"**완료 여부**: {'완료' if progress['completed'] else '미완료'}")
-                            st.markdown("---")
-        
-        except Exception as e:
-            st.error(f"진도 기록을 불러오는 중 오류가 발생했습니다: {e}")
+                        st.session_state.history_print = print_view_markdown(
+                            history['student_name'], start_date_str, end_date_str,
+                            student_progress.to_dict("records"),
+                        )
+                    if "history_print" in st.session_state:
+                        st.markdown(st.session_state.history_print)
+            
+            # 전체 학생 진도 내보내기 (기간 전체를 나눠 읽어 파일로 바로 씀)
+            with st.expander("전체 학생 진도 내보내기"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    export_start = st.date_input("내보내기 시작일", value=start_date, key="export_start")
+                    export_format = st.selectbox("파일 형식", available_formats(), key="export_format")
+                with col2:
+                    export_end = st.date_input("내보내기 종료일", value=end_date, key="export_end")
+                    export_split = st.selectbox("파일 나누기", list(SPLITS), format_func=SPLITS.get,
+                                                key="export_split")
+                
+                if st.button("내보내기 파일 만들기"):
+                    # 이전에 만든 파일은 정리
+                    if "progress_export" in st.session_state:
+                        remove_export(st.session_state.pop("progress_export"))
+                    with st.spinner("내보내는 중..."):
+                        st.session_state.progress_export = export_progress(
+                            get_storage(), students_df, export_start, export_end,
+                            fmt=export_format, split=export_split,
+                        )
+                
+                progress_export = st.session_state.get("progress_export")
+                if progress_export is not None:
+                    st.caption(f"{progress_export['rows']}개 기록 / 파일 {progress_export['files']}개")
+                    with open(progress_export["path"], "rb") as export_file:
+                        st.download_button(
+                            label="내보내기 파일 다운로드",
+                            data=export_file,
+                            file_name=progress_export["file_name"],
+                            mime=progress_export["mime"],
+                        )
     
-    # 학생 상세 페이지 뷰
-    if "view" in st.session_state and st.session_state.view == "student_detail":
-        st.title(f"{st.session_state.selected_student_name} 학생 진도 관리")
-        st.subheader(f"날짜: {st.session_state.selected_date}")
+    except Exception as e:
+        st.error(f"진도 기록을 불러오는 중 오류가 발생했습니다: {e}")
+
+# 학생 상세 페이지 (날짜를 바꾸거나 저장하면 이 부분만 다시 실행하고 그 날짜 기록만 읽음)
+@st.fragment
+@traced("view:detail")
+def student_detail_view():
+    st.title(f"{st.session_state.selected_student_name} 학생 진도 관리")
+    st.subheader(f"날짜: {st.session_state.selected_date}")
+    
+    # 날짜 선택기
+    new_date = st.date_input("다른 날짜 선택", 
+                            value=datetime.strptime(st.session_state.selected_date, "%Y-%m-%d"))
+    st.session_state.selected_date = new_date.strftime('%Y-%m-%d')
+    
+    # 진도 데이터 불러오기
+    try:
+        # 학생/날짜 색인으로 바로 찾기 (같은 학생/날짜면 세션에 저장해 둔 것을 사용)
+        storage = get_storage()
+        selected = (st.session_state.selected_student, st.session_state.selected_date)
+        record = session_memo("detail_record", selected + (storage.version("progress"),),
+                              lambda: storage.get_progress(*selected))
+        student_progress = pd.DataFrame([record] if record else [], columns=PROGRESS_COLUMNS)
         
-        # 날짜 선택기
-        new_date = st.date_input("다른 날짜 선택", 
-                                value=datetime.strptime(st.session_state.selected_date, "%Y-%m-%d"))
-        st.session_state.selected_date = new_date.strftime('%Y-%m-%d')
+        # 시트 반영 상태 표시
+        save_status = get_storage().save_status(st.session_state.selected_student,
+                                                st.session_state.selected_date)
+        if save_status == "failed":
+            st.warning(f"저장 상태: {SAVE_STATUS_LABELS[save_status]}")
+            if st.button("시트에 다시 보내기"):
+                get_storage().retry_save(st.session_state.selected_student, st.session_state.selected_date)
+                st.rerun(scope="fragment")
+        elif save_status:
+            st.caption(f"저장 상태: {SAVE_STATUS_LABELS[save_status]}")
         
-        # 진도 데이터 불러오기
-        try:
-            progress_df = read("progress")
-            student_progress = progress_df[
-                (progress_df["student_id"] == st.session_state.selected_student) & 
-                (progress_df["date"] == st.session_state.selected_date)
-            ]
+        # 진도 입력 폼
+        with st.form("progress_form"):
+            vocabulary = st.text_area("단어", 
+                                     value=student_progress["vocabulary"].values[0] if not student_progress.empty else "")
+            listening = st.text_area("듣기", 
+                                    value=student_progress["listening"].values[0] if not student_progress.empty else "")
+            grammar_review = st.text_area("관리 문법", 
+                                         value=student_progress["grammar_review"].values[0] if not student_progress.empty else "")
+            class_grammar = st.text_area("수업 문법", 
+                                        value=student_progress["class_grammar"].values[0] if not student_progress.empty else "")
+            reading = st.text_area("독해", 
+                                  value=student_progress["reading"].values[0] if not student_progress.empty else "")
+            additional = st.text_area("추가 학습", 
+                                     value=student_progress["additional"].values[0] if not student_progress.empty else "")
+            feedback = st.text_area("일일 피드백", 
+                                   value=student_progress["feedback"].values[0] if not student_progress.empty else "")
+            homework = st.text_area("숙제", 
+                                   value=student_progress["homework"].values[0] if not student_progress.empty else "")
+            completed = st.checkbox("완료", 
+                                   value=bool(student_progress["completed"].values[0]) if not student_progress.empty else False)
             
-            # 진도 입력 폼
-            with st.form("progress_form"):
-                vocabulary = st.text_area("단어", 
-                                         value=student_progress["vocabulary"].values[0] if not student_progress.empty else "")
-                listening = st.text_area("듣기", 
-                                        value=student_progress["listening"].values[0] if not student_progress.empty else "")
-                grammar_review = st.text_area("관리 문법", 
-                                             value=student_progress["grammar_review"].values[0] if not student_progress.empty else "")
-                class_grammar = st.text_area("수업 문법", 
-                                            value=student_progress["class_grammar"].values[0] if not student_progress.empty else "")
-                reading = st.text_area("독해", 
-                                      value=student_progress["reading"].values[0] if not student_progress.empty else "")
-                additional = st.text_area("추가 학습", 
-                                         value=student_progress["additional"].values[0] if not student_progress.empty else "")
-                feedback = st.text_area("일일 피드백", 
-                                       value=student_progress["feedback"].values[0] if not student_progress.empty else "")
-                homework = st.text_area("숙제", 
-                                       value=student_progress["homework"].values[0] if not student_progress.empty else "")
-                completed = st.checkbox("완료", 
-                                       value=student_progress["completed"].values[0] if not student_progress.empty else False)
+            if st.form_submit_button("저장"):
+                progress_data = {
+                    'vocabulary': vocabulary,
+                    'listening': listening,
+                    'grammar_review': grammar_review,
+                    'class_grammar': class_grammar,
+                    'reading': reading,
+                    'additional': additional,
+                    'feedback': feedback,
+                    'homework': homework,
+                    'completed': completed
+                }
                 
-                if st.form_submit_button("저장"):
-                    progress_data = {
-                        'vocabulary': vocabulary,
-                        'listening': listening,
-                        'grammar_review': grammar_review,
-                        'class_grammar': class_grammar,
-                        'reading': reading,
-                        'additional': additional,
-                        'feedback': feedback,
-                        'homework': homework,
-                        'completed': completed
-                    }
-                    
+                too_long = [col for col, value in progress_data.items()
+                            if isinstance(value, str) and len(value) > CELL_LIMIT]
+                if too_long:
+                    st.error(f"{', '.join(too_long)} 항목이 너무 깁니다. (최대 {CELL_LIMIT}자)")
+                else:
                     write("progress", progress_data, 
                          student_id=st.session_state.selected_student, 
                          date=st.session_state.selected_date)
+                    forget_memo("progress_grid", "detail_record")
                     
-                    st.success("진도 정보가 저장되었습니다!")
-            
-            # 이전 진도 기록 표시
-            if not student_progress.empty:
-                with st.expander("저장된 진도 기록"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write("**단어**")
-                        st.write(student_progress["vocabulary"].values[0])
-                        
-                        st.write("**듣기**")
-                        st.write(student_progress["listening"].values[0])
-                        
-                        st.write("**관리 문법**")
-                        st.write(student_progress["grammar_review"].values[0])
-                        
-                        st.write("**수업 문법**")
-                        st.write(student_progress["class_grammar"].values[0])
-                    
-                    with col2:
-                        st.write("**독해**")
-                        st.write(student_progress["reading"].values[0])
-                        
-                        st.write("**추가 학습**")
-                        st.write(student_progress["additional"].values[0])
-                        
-                        st.write("**일일 피드백**")
-                        st.write(student_progress["feedback"].values[0])
-                        
-                        st.write("**숙제**")
-                        st.write(student_progress["homework"].values[0])
-                    
-                    st.write(f"**완료 여부**: {'완료' if student_progress['completed'].values[0] else '미완료'}")
+                    # 시트 반영은 백그라운드에서 진행
+                    st.success("진도 정보가 저장되었습니다! 시트에는 잠시 후 반영됩니다.")
+        
+        # 이전 진도 기록 표시
+        if not student_progress.empty:
+            with st.expander("저장된 진도 기록"):
+                saved = student_progress.iloc[0].to_dict()
+                col1, col2 = st.columns(2)
+                col1.markdown(fields_markdown(saved, LEFT_FIELDS))
+                col2.markdown(fields_markdown(saved, RIGHT_FIELDS))
+                st.markdown(completed_markdown(saved))
+        
+        # 뒤로 가기 버튼
+        if st.button("뒤로 가기"):
+            st.session_state.pop("view", None)
+            st.session_state.pop("selected_student", None)
+            st.session_state.pop("selected_student_name", None)
+            st.session_state.pop("selected_date", None)
+            st.rerun()
+    
+    except Exception as e:
+        st.error(f"진도 데이터를 불러오는 중 오류가 발생했습니다: {e}")
+
+# 관리자용 성능 기록 패널 (사이드바)
+def admin_panel(trace):
+    with st.sidebar:
+        st.subheader("성능 기록")
+        if trace is None or trace.wall is None:
+            st.caption("직전 실행 기록이 없습니다.")
+        else:
+            summary = trace.summary()
+            st.caption("직전 실행")
+            col1, col2 = st.columns(2)
+            col1.metric("실행 시간", f"{summary['wall']:.2f}초")
+            col2.metric("API 호출", summary['api_calls'])
+            col1.metric("받은 크기", f"{summary['bytes'] / 1024:.1f}KB")
+            col2.metric("캐시 적중", f"{summary['cache_hits']}/{summary['cache_hits'] + summary['cache_misses']}")
+            st.dataframe(pd.DataFrame(summary['spans']), hide_index=True)
+        with st.expander("Prometheus 지표"):
+            st.code(TRACE_LOG.prometheus(), language="text")
+
+# 메인 앱
+@traced("rerun")
+def main():
+    # 관리자 패널에는 직전 실행 기록을 표시 (이번 실행 기록은 main이 끝나야 완성됨)
+    previous_trace = st.session_state.get("last_trace")
+    st.session_state.last_trace = current_trace()
+    
+    st.title("학생 진도 관리 시스템")
+    
+    # 시트 구성 확인은 프로세스마다 한 번 백그라운드에서 (끝나기를 기다리지 않고 화면을 그림)
+    schema = get_schema()
+    if schema.error:
+        st.error(f"시트 구성을 확인하는 중 오류가 발생했습니다: {schema.error}")
+        if st.button("다시 확인"):
+            schema.start()
+    for problem in schema.problems.values():
+        st.warning(problem)
+    
+    # 지표 등록
+    register_metrics()
+    
+    # 탭 설정
+    tab1, tab2, tab3 = st.tabs(["오늘의 수업", "전체 학생 관리", "진도 기록 조회"])
+    
+    with tab1:
+        today_class_view()
+    
+    with tab2, span("tab:students"):
+        st.header("전체 학생 관리")
+        
+        # 새 학생 추가 폼
+        with st.expander("새 학생 추가"):
+            with st.form("new_student"):
+                new_name = st.text_input("학생 이름")
+                new_class_type = st.selectbox("반 선택", ["월수금", "화목토"])
+                new_time = st.time_input("등원 시간")
+                new_duration = st.number_input("수업 시간 (분)", min_value=30, max_value=180, step=30)
+                
+                if st.form_submit_button("학생 추가"):
+                    try:
+                        # 저장소에 추가 (새 학생 ID는 저장소에서 생성)
+                        get_storage().add_student(new_name, new_class_type,
+                                                  new_time.strftime("%H:%M"), new_duration)
+                        st.success(f"{new_name} 학생이 추가되었습니다!")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"학생 추가 중 오류가 발생했습니다: {e}")
+        
+        # 여러 학생 한 번에 추가 (CSV 파일 또는 엑셀에서 복사한 표)
+        with st.expander("여러 학생 한 번에 추가"):
+            st.caption("머리글: 이름, 반, 등원 시간, 수업 시간 (예: 홍길동, 월수금, 15:30, 60)")
+            import_file = st.file_uploader("CSV 파일", type=["csv", "txt"], key="import_file")
+            import_text = st.text_area("또는 표를 붙여넣기", key="import_text")
             
-            # 뒤로 가기 버튼
-            if st.button("뒤로 가기"):
-                st.session_state.pop("view", None)
-                st.session_state.pop("selected_student", None)
-                st.session_state.pop("selected_student_name", None)
-                st.session_state.pop("selected_date", None)
-                st.rerun()
+            if st.button("학생 가져오기"):
+                try:
+                    text = decode_upload(import_file.getvalue()) if import_file is not None else import_text
+                    students, errors = validate_students(read_table(text), read("students"))
+                    if students:
+                        # 한 번의 요청으로 모두 추가
+                        new_ids = get_storage().add_students(students)
+                        st.success(f"{len(new_ids)}명의 학생이 추가되었습니다!")
+                    elif not errors:
+                        st.info("추가할 학생이 없습니다.")
+                    for error in errors:
+                        st.warning(error)
+                except Exception as e:
+                    st.error(f"학생 가져오기 중 오류가 발생했습니다: {e}")
+        
+        # 학생 목록 표시
+        try:
+            students_df = read("students")
+            if students_df.empty:
+                st.info("등록된 학생이 없습니다.")
+            else:
+                st.subheader("학생 목록")
+                # 반별로 등원 시간 순 정렬된 목록
+                schedule = get_schedule(get_storage().version("students"), students_df)
+                
+                for class_type, class_students in schedule.by_class_type.items():
+                    st.write(f"### {class_type}반")
+                    # 반마다 한 페이지씩만 그림
+                    start, end = page_controls(f"students_cursor_{class_type}", len(class_students),
+                                               STUDENT_PAGE_SIZE)
+                    for student in class_students.iloc[start:end].to_dict("records"):
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.write(f"**{student['name']}** - {student['time']}")
+                        with col2:
+                            if st.button("진도 관리", key=f"progress_{student['student_id']}"):
+                                st.session_state.selected_student = student['student_id']
+                                st.session_state.selected_student_name = student['name']
+                                st.session_state.selected_date = get_kr_today()
+                                st.session_state.view = "student_detail"
+                                st.rerun()
         
         except Exception as e:
-            st.error(f"진도 데이터를 불러오는 중 오류가 발생했습니다: {e}")
+            st.error(f"학생 목록을 불러오는 중 오류가 발생했습니다: {e}")
+    
+    with tab3:
+        history_view()
+    
+    # 학생 상세 페이지 뷰
+    if "view" in st.session_state and st.session_state.view == "student_detail":
+        student_detail_view()
+    
+    if ADMIN_PANEL:
+        admin_panel(previous_trace)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fake_sheets import FakeClient
+from schema import SchemaGuard
+from sheets import SheetsPool
+from storage import SheetsStorage
+
+SPREADSHEET_NAME = "학생진도관리"
+
+
+# 가짜 시트 위의 시트 저장소를 만드는 함수 (시트 구성 확인이 끝난 상태로)
+# make_sheets(ttl=..., **SchemaGuard 옵션) → client / spreadsheet / pool / schema / storage
+@pytest.fixture
+def make_sheets():
+    def make(ttl=0, **schema_options):
+        client = FakeClient()
+        pool = SheetsPool(None, SPREADSHEET_NAME, client_factory=lambda: client)
+        schema = SchemaGuard(pool, **schema_options).start()
+        schema.wait()
+        storage = SheetsStorage(pool, ttl=ttl, schema=schema)
+        schema.add_listener(storage.invalidate)
+        return SimpleNamespace(client=client, spreadsheet=client.open(SPREADSHEET_NAME),
+                               pool=pool, schema=schema, storage=storage)
+    return make
+
+
+# 기본 설정의 가짜 시트
+@pytest.fixture
+def sheets(make_sheets):
+    return make_sheets()
@@ -0,0 +1,60 @@
+import threading
+
+from fake_sheets import FakeClient
+from id_allocator import ID_BLOCK_COLUMNS, ID_SHEET, SheetIdAllocator
+from sheets import SheetsPool
+
+SPREADSHEET_NAME = "학생진도관리"
+
+
+# 기존 학생이 5명이라고 적힌 발급 기록 시트만 있는 스프레드시트 (학생 명단 시트는 없음)
+def seeded_client():
+    client = FakeClient()
+    spreadsheet = client.create(SPREADSHEET_NAME)
+    worksheet = spreadsheet.add_worksheet(title=ID_SHEET, rows=10, cols=len(ID_BLOCK_COLUMNS))
+    worksheet.load([ID_BLOCK_COLUMNS, [5, "existing", ""]])
+    return client
+
+
+def allocator(client):
+    return SheetIdAllocator(SheetsPool(None, SPREADSHEET_NAME, client_factory=lambda: client))
+
+
+# 두 곳에서 번갈아 예약해도 번호가 겹치지 않고, 기존 학생 수 다음 번호부터 빈틈없이 이어짐
+# (명단 시트가 없으므로 명단을 읽으려 하면 실패함)
+def test_interleaved_reservations_are_disjoint():
+    client = seeded_client()
+    first, second = allocator(client), allocator(client)
+
+    blocks = [first.reserve(3), second.reserve(2), first.reserve(4), second.reserve(1), first.reserve(2)]
+
+    assert blocks == [[6, 7, 8], [9, 10], [11, 12, 13, 14], [15], [16, 17]]
+    # 기억해 둔 합계 뒤에 새로 생긴 행만 읽음 (첫 예약만 "existing" 행부터)
+    assert first.stats["rows_read"] == 1 + 1 + 1
+    assert second.stats["rows_read"] == 2 + 1
+
+
+# 여러 스레드에서 동시에 예약해도 겹치지 않음
+def test_concurrent_reservations_are_disjoint():
+    client = seeded_client()
+    allocators = [allocator(client) for _ in range(4)]
+    reserved = []
+    lock = threading.Lock()
+
+    def run(target):
+        for count in (1, 2, 3):
+            block = target.reserve(count)
+            with lock:
+                reserved.append(block)
+
+    threads = [threading.Thread(target=run, args=(target,)) for target in allocators]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    numbers = [number for block in reserved for number in block]
+    assert len(reserved) == 12
+    assert sorted(numbers) == list(range(6, 6 + 4 * 6))
+    for block in reserved:
+        assert block == list(range(block[0], block[0] + len(block)))
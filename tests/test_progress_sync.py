@@ -0,0 +1,32 @@
+import tracing
+
+
+# 헤더 오른쪽 칸에 메모가 있어도 증분 동기화를 계속 씀
+def test_note_right_of_header_keeps_delta_sync(sheets):
+    storage = sheets.storage
+    storage.write("progress", {"homework": "워크북 2쪽"}, student_id="001", date="2026-10-19")
+    sheets.spreadsheet.worksheet("progress").update([["선생님 메모"]], "M2")
+
+    storage.invalidate()
+    for _ in range(5):
+        records = storage.records("progress", fresh=True)
+
+    assert storage.sync.stats["full_syncs"] == 2
+    assert storage.sync.stats["delta_syncs"] == 4
+    assert list(records[0]) == storage.sync.header
+
+
+# 받은 크기는 응답 본문 길이로 한 번만 셈 (동기화 기록과 화면 실행 기록이 같은 값)
+def test_received_bytes_come_from_responses(sheets):
+    client, storage = sheets.client, sheets.storage
+    storage.write("progress", {"homework": "워크북 2쪽"}, student_id="001", date="2026-10-19")
+    storage.invalidate()
+
+    with tracing.span("test", log=tracing.TraceLog()) as trace:
+        before = client._backend.snapshot()["bytes"]
+        storage.records("progress", fresh=True)
+        received = client._backend.snapshot()["bytes"] - before
+
+    assert storage.sync.last_sync["mode"] == "full"
+    assert storage.sync.last_sync["bytes"] == received > 0
+    assert trace.counters["bytes"] == received
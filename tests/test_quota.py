@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+
+import gspread
+import pytest
+import requests
+
+from fake_sheets import quota_error
+from quota import BACKGROUND, INTERACTIVE, QuotaScheduler
+
+
+# 테스트가 직접 움직이는 시계
+# - 기다릴 시간이 정해진 대기 / sleep은 그만큼 시계를 바로 앞당김
+# - hold 중에는 시계를 멈추고 짧게만 기다림 (여러 호출이 줄을 서게 할 때)
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.hold = False
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def wait(self, condition, timeout):
+        if timeout is None or self.hold:
+            condition.wait(0.005)
+        else:
+            self.now += timeout
+
+
+def scheduler(clock, **options):
+    return QuotaScheduler(clock=clock, sleep=clock.sleep, wait=clock.wait, **options)
+
+
+def server_error():
+    response = requests.Response()
+    response.status_code = 503
+    response._content = json.dumps({"error": {"code": 503, "message": "unavailable", "status": "UNAVAILABLE"}}).encode()
+    return gspread.exceptions.APIError(response)
+
+
+# 경쟁이 없으면 기다린 것으로 세지 않고, 토큰이 떨어졌을 때만 기다린 시간을 더함
+def test_only_real_waits_count_as_throttled():
+    clock = FakeClock()
+    quota = scheduler(clock, reads_per_minute=60)
+    for _ in range(60):
+        quota.call("read", lambda: None)
+    assert quota.stats["throttled"] == 0
+    assert quota.stats["throttle_wait"] == 0
+
+    quota.call("read", lambda: None)
+    assert quota.stats["throttled"] == 1
+    assert quota.stats["throttle_wait"] == pytest.approx(1.0)
+
+
+# 토큰을 기다리는 호출은 도착 순서와 관계없이 화면 호출이 먼저
+def test_interactive_calls_go_before_background():
+    clock = FakeClock()
+    quota = scheduler(clock, reads_per_minute=1)
+    quota.call("read", lambda: None)
+    clock.hold = True
+    order = []
+
+    def run(name, level):
+        quota.call("read", lambda: order.append(name), level=level)
+
+    threads = []
+    for depth, (name, level) in enumerate((("background", BACKGROUND), ("interactive", INTERACTIVE)), 1):
+        threads.append(threading.Thread(target=run, args=(name, level)))
+        threads[-1].start()
+        while quota.queue_depth("read") < depth:
+            time.sleep(0.001)
+    clock.hold = False
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["interactive", "background"]
+
+
+# 429를 받으면 Retry-After만큼 모든 호출을 멈췄다가 다시 시도
+def test_rate_limit_pauses_for_retry_after():
+    clock = FakeClock()
+    quota = scheduler(clock)
+    responses = [quota_error(retry_after=30), "ok"]
+
+    def func():
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert quota.call("read", func) == "ok"
+    assert clock.now >= 30
+    assert quota.stats["rate_limited"] == 1
+    assert quota.stats["retries"] == 1
+
+
+# 다시 시도할 수 있는 오류도 max_retries번까지만 재시도하고, 그 밖의 오류는 바로 올려보냄
+def test_retry_limit_and_non_retryable_errors():
+    clock = FakeClock()
+    quota = scheduler(clock, max_retries=2)
+    attempts = []
+
+    def unavailable():
+        attempts.append(clock.now)
+        raise server_error()
+
+    with pytest.raises(gspread.exceptions.APIError):
+        quota.call("read", unavailable)
+    assert len(attempts) == 3
+    assert quota.stats["retries"] == 2
+
+    def broken():
+        attempts.append(clock.now)
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        quota.call("read", broken)
+    assert len(attempts) == 4
+    assert quota.stats["retries"] == 2
@@ -0,0 +1,35 @@
+from storage import STUDENT_COLUMNS
+
+
+# 헤더 오른쪽 칸의 메모는 헤더 변경으로 보지 않음
+def test_note_right_of_header_is_not_a_mismatch(sheets):
+    spreadsheet, schema, storage = sheets.spreadsheet, sheets.schema, sheets.storage
+    storage.add_student("홍길동", "월수금", "15:00", 60)
+    storage.write("progress", {"homework": "워크북 2쪽"}, student_id="001", date="2026-10-19")
+    spreadsheet.worksheet("students").update([["메모"]], "H2")
+    spreadsheet.worksheet("progress").update([["메모"]], "M2")
+
+    storage.invalidate()
+    for _ in range(5):
+        storage.read("students")
+        storage.records("progress", fresh=True)
+
+    assert schema.stats["mismatches"] == 0
+    assert schema.stats["verifications"] == 1
+
+
+# 헤더가 바뀌면 다시 확인하지만, 간격 안에서는 한 번만
+def test_reverification_is_rate_limited(make_sheets):
+    sheets = make_sheets(reverify_interval=3600)
+    spreadsheet, schema, storage = sheets.spreadsheet, sheets.schema, sheets.storage
+    storage.add_student("홍길동", "월수금", "15:00", 60)
+    sheet = spreadsheet.worksheet("students")
+
+    for name in ("메모1", "메모2", "메모3"):
+        sheet.update([STUDENT_COLUMNS + [name]], "A1:G1")
+        storage.cache.invalidate()
+        storage.read("students")
+        schema.wait()
+
+    assert schema.stats["verifications"] == 2
+    assert schema.stats["reverify_skipped"] == 2
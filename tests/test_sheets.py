@@ -0,0 +1,25 @@
+# 시트 저장소의 쓰기가 쓰는 API 호출 수 (반환값과 실제 호출 수가 같아야 함)
+def test_warm_writes_cost_one_call_each(sheets):
+    storage, backend = sheets.storage, sheets.client._backend
+    storage.write("progress", {"homework": "워크북 2쪽"}, student_id="001", date="2026-10-19")
+    storage.write("progress", {"homework": "워크북 2쪽"}, student_id="002", date="2026-10-19")
+
+    def calls(write):
+        before = backend.snapshot()["calls"]
+        used = write()
+        return used, backend.snapshot()["calls"] - before
+
+    # 기존 행 갱신: batch_update 한 번 (여러 행이어도 한 번)
+    assert calls(lambda: storage.write("progress", {"homework": "단어 시험"},
+                                       student_id="001", date="2026-10-19")) == (1, 1)
+    assert calls(lambda: storage.write_many([
+        ("001", "2026-10-19", {"feedback": "잘함"}),
+        ("002", "2026-10-19", {"feedback": "복습 필요"}),
+    ])) == (1, 1)
+    # 새 행 추가: append_rows 한 번
+    assert calls(lambda: storage.write("progress", {"homework": "새 숙제"},
+                                       student_id="001", date="2026-10-20")) == (1, 1)
+
+    assert storage.get_progress("001", "2026-10-19")["homework"] == "단어 시험"
+    assert storage.get_progress("002", "2026-10-19")["feedback"] == "복습 필요"
+    assert storage.get_progress("001", "2026-10-20")["homework"] == "새 숙제"
@@ -0,0 +1,97 @@
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from storage import SQLiteStorage, SyncedStorage
+
+
+# 가짜 시트 위의 로컬 저장소 + 동기화 (백그라운드 스레드 없이 push / pull을 직접 호출)
+@pytest.fixture
+def synced(tmp_path, make_sheets):
+    remote = make_sheets(ttl=60).storage
+    return SyncedStorage(SQLiteStorage(str(tmp_path / "progress.db")), remote)
+
+
+# 로컬에서 만든 학생 / 진도를 밀어내고 다시 받아와도 한 줄씩만 남아야 함
+# (시트에서는 "001"이 1로 읽힘)
+def test_push_pull_round_trip_keeps_one_row(synced):
+    student_id = synced.add_student("홍길동", "월수금", "15:00", 60)
+    synced.write("progress", {"homework": "워크북 2쪽"}, student_id=student_id, date="2026-10-19")
+
+    synced.worker.push()
+    synced.worker.pull()
+    synced.worker.push()
+    synced.worker.pull()
+
+    students = synced.read("students")
+    assert students["student_id"].tolist() == [student_id]
+    assert len(synced.read("progress")) == 1
+    assert synced.get_progress(student_id, "2026-10-19")["homework"] == "워크북 2쪽"
+    assert len(synced.remote.read("students")) == 1
+    assert len(synced.remote.read("progress")) == 1
+
+
+# 예전 버전이 "1" 형식으로 받아 둔 행은 열 때 "001" 형식으로 합쳐짐
+def test_unpadded_ids_are_merged_on_open(tmp_path):
+    path = str(tmp_path / "progress.db")
+    SQLiteStorage(path).close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany("INSERT INTO students (student_id, name) VALUES (?, ?)", [("001", "홍길동"), ("1", "홍길동")])
+        conn.executemany("INSERT INTO progress (student_id, date) VALUES (?, ?)",
+                         [("001", "2026-10-19"), ("1", "2026-10-19"), ("2", "2026-10-19")])
+    conn.close()
+
+    local = SQLiteStorage(path)
+    assert local.read("students")["student_id"].tolist() == ["001"]
+    day = date(2026, 10, 19)
+    rows = pd.concat(local.iter_progress(day, day))
+    assert rows["student_id"].tolist() == ["001", "002"]
+
+
+# 시트에서 읽은 진도도 로컬과 같은 형식 ("FALSE" → False, 1 → "001")
+def test_sheets_progress_values_are_typed(synced):
+    remote = synced.remote
+    student_id = remote.add_student("홍길동", "월수금", "15:00", 60)
+    remote.write("progress", {"homework": "워크북 2쪽", "completed": False}, student_id=student_id, date="2026-10-19")
+    remote.invalidate()
+
+    record = remote.get_progress(student_id, "2026-10-19")
+    assert record["completed"] is False
+    assert record["student_id"] == student_id
+    history = remote.query_progress(student_id, date(2026, 10, 1), date(2026, 10, 31))
+    assert history["completed"].tolist() == [False]
+    chunk = next(remote.iter_progress(date(2026, 10, 1), date(2026, 10, 31)))
+    assert chunk["student_id"].tolist() == [student_id]
+    assert chunk["completed"].tolist() == [False]
+    progress = remote.read("progress")
+    assert progress["student_id"].tolist() == [student_id]
+    roster = remote.read("students")
+    assert roster["student_id"].tolist() == [student_id]
+    assert len(progress[progress["student_id"].isin(roster["student_id"])]) == 1
+
+
+# 바뀐 것이 없는 받아오기는 로컬에 아무 행도 넘기지 않고, 시트에 새로 생긴 행만 넘김
+def test_delta_pull_merges_only_changed_rows(synced):
+    for day in ("2026-10-19", "2026-10-20", "2026-10-21"):
+        synced.remote.write("progress", {"homework": day}, student_id="001", date=day)
+    merged = []
+    merge_remote = synced.local.merge_remote
+
+    def spy(sheet_name, records):
+        if sheet_name == "progress":
+            merged.append(len(records))
+        return merge_remote(sheet_name, records)
+
+    synced.local.merge_remote = spy
+    synced.worker.pull()
+    synced.worker.pull()
+    sheet = synced.remote.pool.worksheet("progress")
+    sheet.append_rows([["002", "2026-10-19", "", "", "", "", "", "", "", "시트에서 입력", "FALSE"]])
+    synced.worker.pull()
+
+    assert merged == [3, 0, 1]
+    assert len(synced.read("progress")) == 4
+    assert synced.get_progress("002", "2026-10-19")["homework"] == "시트에서 입력"
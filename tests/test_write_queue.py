@@ -0,0 +1,79 @@
+import json
+
+import gspread
+import requests
+from google.auth.exceptions import RefreshError
+
+from write_queue import WriteQueue
+
+
+# 셀 하나가 너무 길 때 실제 API가 돌려주는 것과 같은 400 오류
+def bad_request():
+    response = requests.Response()
+    response.status_code = 400
+    response._content = json.dumps({
+        "error": {"code": 400, "message": "Your input contains more than the maximum of 50000 characters",
+                  "status": "INVALID_ARGUMENT"},
+    }).encode("utf-8")
+    return gspread.exceptions.APIError(response)
+
+
+# "bad" 값이 들어 있는 요청이 섞이면 묶음 전체를 거부하는 sink
+class Sink:
+    def __init__(self):
+        self.written = []
+        self.error = None
+
+    def __call__(self, entries):
+        if self.error is not None:
+            raise self.error
+        if any(data.get("homework") == "bad" for _, _, data in entries):
+            raise bad_request()
+        self.written.extend(entries)
+
+
+def test_bad_entry_does_not_fail_the_batch(tmp_path):
+    sink = Sink()
+    queue = WriteQueue(str(tmp_path / "queue.db"), sink)
+    queue.enqueue("001", "2026-10-19", {"homework": "워크북 2쪽"})
+    queue.enqueue("002", "2026-10-19", {"homework": "bad"})
+    queue.enqueue("003", "2026-10-19", {"homework": "단어 시험"})
+
+    queue.drain_once()
+
+    assert [student_id for student_id, _, _ in sink.written] == ["001", "003"]
+    assert queue.status("001", "2026-10-19") == "confirmed"
+    assert queue.status("002", "2026-10-19") == "failed"
+    # 실패한 값도 화면에서 사라지지 않음
+    assert queue.pending_data("002", "2026-10-19") == {"homework": "bad"}
+
+
+def test_auth_errors_are_retried(tmp_path):
+    sink = Sink()
+    queue = WriteQueue(str(tmp_path / "queue.db"), sink, base_delay=0)
+    queue.enqueue("001", "2026-10-19", {"homework": "워크북 2쪽"})
+
+    sink.error = RefreshError("token refresh failed")
+    queue.drain_once()
+    assert queue.status("001", "2026-10-19") == "retrying"
+
+    sink.error = None
+    queue.drain_once()
+    assert queue.status("001", "2026-10-19") == "confirmed"
+
+
+def test_failed_entry_can_be_requeued(tmp_path):
+    sink = Sink()
+    queue = WriteQueue(str(tmp_path / "queue.db"), sink)
+    queue.enqueue("001", "2026-10-19", {"homework": "bad", "feedback": "잘함"})
+    queue.drain_once()
+    assert queue.status("001", "2026-10-19") == "failed"
+
+    # 고친 값을 저장한 뒤 다시 보내면 실패한 값과 합쳐 한 번에 보냄
+    queue.enqueue("001", "2026-10-19", {"homework": "워크북 2쪽"})
+    assert queue.retry_failed("001", "2026-10-19") == 1
+    queue.drain_once()
+
+    assert sink.written == [("001", "2026-10-19", {"homework": "워크북 2쪽", "feedback": "잘함"})]
+    assert queue.status("001", "2026-10-19") == "confirmed"
+    assert queue.depth() == 0
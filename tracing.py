@@ -0,0 +1,204 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("progress_app.trace")
+
+# 구간마다 모으는 카운터
+COUNTERS = ["api_calls", "bytes", "cache_hits", "cache_misses"]
+
+# 실행(rerun) 시간 분포 구간 (초)
+RERUN_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 4, 8]
+
+# Prometheus 지표 이름 앞부분
+METRIC_PREFIX = "progress_app"
+
+_context = threading.local()
+
+
+# 현재 스레드에서 기록 중인 실행 (없으면 None)
+def current_trace():
+    return getattr(_context, "trace", None)
+
+
+# 기록 중인 실행의 카운터 올리기 (기록 중이 아니면 아무것도 하지 않음)
+def count(name, amount=1):
+    trace = current_trace()
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + amount
+
+
+# 한 번의 실행 (스크립트 전체 또는 fragment 하나) 동안 모은 기록
+class Trace:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.wall = None
+        self.counters = {}
+        self.spans = []
+
+    # 구간 하나의 시간과 카운터 변화 기록
+    @contextmanager
+    def span(self, name):
+        before = dict(self.counters)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            entry = {"name": name, "wall": time.perf_counter() - start}
+            for key in COUNTERS:
+                entry[key] = self.counters.get(key, 0) - before.get(key, 0)
+            self.spans.append(entry)
+
+    # 로그 / 화면 표시용 요약
+    def summary(self):
+        return {
+            "trace": self.name,
+            "started": self.started,
+            "wall": self.wall,
+            **{key: self.counters.get(key, 0) for key in COUNTERS},
+            "spans": list(self.spans),
+        }
+
+
+# 끝난 실행 기록 모음
+# - 최근 기록 size개와 구간 이름별 누적값을 들고 있음
+# - 누적값과 등록된 지표(collector)를 Prometheus 텍스트 형식으로 내보냄
+class TraceLog:
+    def __init__(self, size=200):
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=size)
+        self._spans = {}
+        self._runs = {}
+        self._collectors = {}
+
+    # 끝난 실행 반영 (구조화 로그 한 줄도 남김)
+    def record(self, trace):
+        with self._lock:
+            self.recent.append(trace)
+            for entry in trace.spans:
+                totals = self._spans.setdefault(entry["name"], {"count": 0, "wall": 0.0, **dict.fromkeys(COUNTERS, 0)})
+                totals["count"] += 1
+                totals["wall"] += entry["wall"]
+                for key in COUNTERS:
+                    totals[key] += entry[key]
+            runs = self._runs.setdefault(trace.name, {"count": 0, "sum": 0.0, "buckets": [0] * len(RERUN_BUCKETS)})
+            runs["count"] += 1
+            runs["sum"] += trace.wall
+            for idx, bound in enumerate(RERUN_BUCKETS):
+                if trace.wall <= bound:
+                    runs["buckets"][idx] += 1
+        logger.info(json.dumps(trace.summary(), ensure_ascii=False))
+
+    # 내보낼 때 함께 읽을 지표 등록 (func()는 {이름: 숫자} 사전을 반환)
+    def add_collector(self, name, func):
+        with self._lock:
+            self._collectors[name] = func
+
+    # Prometheus 텍스트 형식
+    def prometheus(self):
+        with self._lock:
+            spans = {name: dict(totals) for name, totals in self._spans.items()}
+            runs = {name: {**totals, "buckets": list(totals["buckets"])} for name, totals in self._runs.items()}
+            collectors = dict(self._collectors)
+
+        lines = [
+            f"# HELP {METRIC_PREFIX}_span_seconds Wall time spent in traced sections",
+            f"# TYPE {METRIC_PREFIX}_span_seconds summary",
+        ]
+        for name, totals in sorted(spans.items()):
+            lines.append(f'{METRIC_PREFIX}_span_seconds_sum{{span="{name}"}} {totals["wall"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds_count{{span="{name}"}} {totals["count"]}')
+        for key in COUNTERS:
+            lines.append(f"# TYPE {METRIC_PREFIX}_span_{key}_total counter")
+            for name, totals in sorted(spans.items()):
+                lines.append(f'{METRIC_PREFIX}_span_{key}_total{{span="{name}"}} {totals[key]}')
+
+        lines.append(f"# HELP {METRIC_PREFIX}_run_seconds Wall time of whole reruns and fragment reruns")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_seconds histogram")
+        for name, totals in sorted(runs.items()):
+            for bound, value in zip(RERUN_BUCKETS, totals["buckets"]):
+                lines.append(f'{METRIC_PREFIX}_run_seconds_bucket{{trace="{name}",le="{bound}"}} {value}')
+            lines.append(f'{METRIC_PREFIX}_run_seconds_bucket{{trace="{name}",le="+Inf"}} {totals["count"]}')
+            lines.append(f'{METRIC_PREFIX}_run_seconds_sum{{trace="{name}"}} {totals["sum"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_run_seconds_count{{trace="{name}"}} {totals["count"]}')
+
+        for collector, func in sorted(collectors.items()):
+            try:
+                metrics = func()
+            except Exception:
+                logger.exception("지표를 읽지 못했습니다: %s", collector)
+                continue
+            for key, value in sorted(metrics.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"{METRIC_PREFIX}_{collector}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전체에서 쓰는 기록 모음
+TRACE_LOG = TraceLog()
+
+
+# 구간 기록
+# 기록 중인 실행이 있으면 그 안의 구간으로, 없으면 새 실행으로 기록
+@contextmanager
+def span(name, log=TRACE_LOG):
+    trace = current_trace()
+    if trace is not None:
+        with trace.span(name):
+            yield trace
+        return
+
+    trace = Trace(name)
+    _context.trace = trace
+    start = time.perf_counter()
+    try:
+        with trace.span(name):
+            yield trace
+    finally:
+        _context.trace = None
+        trace.wall = time.perf_counter() - start
+        log.record(trace)
+
+
+# 함수 호출을 구간으로 기록하는 데코레이터
+def traced(name):
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# /metrics 요청에 Prometheus 텍스트를 돌려주는 HTTP 처리기
+class MetricsHandler(BaseHTTPRequestHandler):
+    log = TRACE_LOG
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.log.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # 요청마다 표준 오류로 찍히는 접근 로그는 남기지 않음
+    def log_message(self, format, *args):
+        pass
+
+
+# 별도 스레드에서 /metrics HTTP 서버 시작
+def start_metrics_server(port, host="0.0.0.0"):
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,242 @@
+import json
+import sqlite3
+import threading
+import time
+
+from quota import BACKGROUND, backoff_delay, is_transient, priority
+
+
+# 진도 저장용 write-behind 큐
+# - SQLite 파일에 저장되어 프로세스가 재시작되어도 남아 있음
+# - 같은 (student_id, date)의 대기 중 항목은 하나로 합침
+# - 백그라운드 스레드가 앞에서부터 batch_size개씩 묶어 sink([(student_id, date, data)])를 호출해 비움
+# - 429 / 5xx / 네트워크 / 인증 토큰 오류는 묶음 전체를 지수 백오프 후 재시도
+# - 그 밖의 오류는 요청을 하나씩 다시 보내 실제로 실패한 요청만 "failed"로 남김
+# - "failed" 요청의 값은 다시 저장하거나 retry_failed()로 다시 넣을 때까지 화면에 그대로 보임
+class WriteQueue:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS write_queue (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            data TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt REAL NOT NULL DEFAULT 0,
+            last_error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS write_queue_key ON write_queue (student_id, date, status);
+        CREATE INDEX IF NOT EXISTS write_queue_status ON write_queue (status, seq);
+    """
+
+    def __init__(self, path, sink, batch_size=50, base_delay=1.0, max_delay=60.0, clock=time.time):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(self.SCHEMA)
+        with self._conn:
+            # 보내는 도중 종료된 항목은 다시 보냄 (upsert라 두 번 보내도 결과는 같음)
+            self._conn.execute("UPDATE write_queue SET status = 'pending' WHERE status = 'in_flight'")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "written": 0,
+            "retries": 0,
+            "failed": 0,
+            "split_batches": 0,
+            "requeued": 0,
+        }
+
+    # 저장 요청 추가, 같은 키의 대기 중 항목이 있으면 합침
+    def enqueue(self, student_id, date, data):
+        key = [str(student_id), str(date)]
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT seq, data FROM write_queue WHERE student_id = ? AND date = ? AND status = 'pending'",
+                key,
+            ).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO write_queue (student_id, date, data) VALUES (?, ?, ?)",
+                    key + [json.dumps(data, ensure_ascii=False)],
+                )
+            else:
+                merged = {**json.loads(row["data"]), **data}
+                self._conn.execute(
+                    "UPDATE write_queue SET data = ? WHERE seq = ?",
+                    [json.dumps(merged, ensure_ascii=False), row["seq"]],
+                )
+                self.stats["coalesced"] += 1
+            self.stats["enqueued"] += 1
+        self._wake.set()
+
+    # 가장 최근 요청의 상태: "pending" / "retrying" / "confirmed" / "failed" / None
+    def status(self, student_id, date):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, attempts FROM write_queue WHERE student_id = ? AND date = ? ORDER BY seq DESC LIMIT 1",
+                [str(student_id), str(date)],
+            ).fetchone()
+        if row is None:
+            return None
+        if row["status"] in ("pending", "in_flight"):
+            return "retrying" if row["attempts"] else "pending"
+        return row["status"]
+
+    # 아직 시트에 반영되지 않은 값 (실패한 요청 포함, 요청 순서대로 합침)
+    def pending_data(self, student_id, date):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM write_queue WHERE student_id = ? AND date = ? "
+                "AND status IN ('pending', 'in_flight', 'failed') ORDER BY seq",
+                [str(student_id), str(date)],
+            ).fetchall()
+        data = {}
+        for row in rows:
+            data.update(json.loads(row["data"]))
+        return data
+
+    # 대기 중인 요청 수
+    def depth(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM write_queue WHERE status IN ('pending', 'in_flight')"
+            ).fetchone()[0]
+
+    # 맨 앞에서부터 요청 묶음 하나 처리
+    # 처리했으면 0, 맨 앞 요청이 백오프 중이면 남은 대기 시간, 비어 있으면 None
+    def drain_once(self):
+        with self._lock, self._conn:
+            head = self._conn.execute(
+                "SELECT next_attempt FROM write_queue WHERE status = 'pending' ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if head is None:
+                return None
+            now = self.clock()
+            if head["next_attempt"] > now:
+                return head["next_attempt"] - now
+            rows = self._conn.execute(
+                "SELECT * FROM write_queue WHERE status = 'pending' AND next_attempt <= ? ORDER BY seq LIMIT ?",
+                [now, self.batch_size],
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE write_queue SET status = 'in_flight' WHERE seq = ?", [[row["seq"]] for row in rows]
+            )
+
+        entries = [(row["student_id"], row["date"], json.loads(row["data"])) for row in rows]
+        try:
+            self.sink(entries)
+        except Exception as e:
+            if is_transient(e) or len(rows) == 1:
+                self._settle_failed(rows, e)
+                return 0
+            # 묶음 안의 요청 하나 때문일 수 있으므로 하나씩 다시 보내 실패한 요청만 골라냄
+            self.stats["split_batches"] += 1
+            for row, entry in zip(rows, entries):
+                try:
+                    self.sink([entry])
+                except Exception as error:
+                    self._settle_failed([row], error)
+                else:
+                    self._confirm([row])
+            return 0
+        self._confirm(rows)
+        return 0
+
+    # 보내지 못한 요청 처리: 다시 보내면 될 오류는 백오프 후 재시도, 아니면 "failed"
+    def _settle_failed(self, rows, error):
+        with self._lock, self._conn:
+            if is_transient(error):
+                self._conn.executemany(
+                    "UPDATE write_queue SET status = 'pending', attempts = ?, next_attempt = ?, last_error = ? "
+                    "WHERE seq = ?",
+                    [[row["attempts"] + 1,
+                      self.clock() + backoff_delay(row["attempts"] + 1, self.base_delay, self.max_delay),
+                      str(error), row["seq"]] for row in rows],
+                )
+                self.stats["retries"] += len(rows)
+            else:
+                self._conn.executemany(
+                    "UPDATE write_queue SET status = 'failed', attempts = ?, last_error = ? WHERE seq = ?",
+                    [[row["attempts"] + 1, str(error), row["seq"]] for row in rows],
+                )
+                self.stats["failed"] += len(rows)
+
+    # 시트에 반영된 요청 표시
+    def _confirm(self, rows):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE write_queue SET status = 'confirmed' WHERE seq = ?", [[row["seq"]] for row in rows]
+            )
+            # 같은 키의 이전 기록은 정리
+            self._conn.executemany(
+                "DELETE FROM write_queue WHERE student_id = ? AND date = ? AND seq < ? "
+                "AND status IN ('confirmed', 'failed')",
+                [[row["student_id"], row["date"], row["seq"]] for row in rows],
+            )
+            self.stats["written"] += len(rows)
+
+    # 실패한 요청을 다시 대기열에 넣음 (student_id / date를 주면 그 요청만), 다시 넣은 수를 반환
+    # 같은 키의 대기 중 요청이 있으면 실패한 값 위에 대기 중인 값을 덮어 하나로 합침
+    def retry_failed(self, student_id=None, date=None):
+        where, params = "status = 'failed'", []
+        if student_id is not None:
+            where += " AND student_id = ? AND date = ?"
+            params = [str(student_id), str(date)]
+        with self._lock, self._conn:
+            failed = self._conn.execute(f"SELECT * FROM write_queue WHERE {where} ORDER BY seq", params).fetchall()
+            for row in failed:
+                pending = self._conn.execute(
+                    "SELECT seq, data FROM write_queue WHERE student_id = ? AND date = ? AND status = 'pending'",
+                    [row["student_id"], row["date"]],
+                ).fetchone()
+                if pending is None:
+                    self._conn.execute(
+                        "UPDATE write_queue SET status = 'pending', attempts = 0, next_attempt = 0 WHERE seq = ?",
+                        [row["seq"]],
+                    )
+                else:
+                    merged = {**json.loads(row["data"]), **json.loads(pending["data"])}
+                    self._conn.execute("UPDATE write_queue SET data = ? WHERE seq = ?",
+                                       [json.dumps(merged, ensure_ascii=False), pending["seq"]])
+                    self._conn.execute("DELETE FROM write_queue WHERE seq = ?", [row["seq"]])
+            self.stats["requeued"] += len(failed)
+        if failed:
+            self._wake.set()
+        return len(failed)
+
+    def _loop(self):
+        # 화면에서 하는 호출보다 뒤에 처리
+        with priority(BACKGROUND):
+            while not self._stop.is_set():
+                wait = self.drain_once()
+                if wait == 0:
+                    continue
+                self._wake.wait(wait)
+                self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="write-behind", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._conn.close()